@@ -1,7 +1,11 @@
 import streamlit as st
-from PIL import Image
+import altair as alt
+import html
 import os
 
+from usmca.results import METRIC_LABELS, RESULTS_PATH, read_results
+from usmca.thumbnails import make_thumbnails
+
 st.set_page_config(page_title="NAFTA vs USMCA Full Report", layout="wide")
 
 st.title("NAFTA vs USMCA: Full State-Level Impact Analysis")
@@ -67,13 +71,30 @@ st.markdown("""
 ### Key Findings with Visuals
 """)
 
+# WebP thumbnails are pre-encoded at deploy time by `python -m usmca.thumbnails`;
+# this only encodes ones that are missing. The source file's mtime is part of the
+# cache key and the file names, so a deploy with new images busts the browser cache.
+@st.cache_resource(show_spinner=False)
+def build_thumbnails(image_path, mtime):
+    return [(f"app/static/thumbnails/{file_name}", width, height)
+            for file_name, width, height in make_thumbnails(image_path)]
+
 # Display function
-def display_section(title, image_file, *explanation_parts):
+def display_section(title, image_file, *explanation_parts, lazy=True):
     st.header(title)
     image_path = os.path.join("images", image_file)
     if os.path.exists(image_path):
-        image = Image.open(image_path)
-        st.image(image, caption=title, use_container_width=True)
+        thumbnails = build_thumbnails(image_path, os.path.getmtime(image_path))
+        src, width, height = thumbnails[-1]
+        srcset = ", ".join(f"{url} {w}w" for url, w, _ in thumbnails)
+        # Images below the fold are only fetched once the reader scrolls to them
+        loading = "lazy" if lazy else "eager"
+        st.markdown(
+            f'<img src="{src}" srcset="{srcset}" sizes="100vw" width="{width}" height="{height}" '
+            f'loading="{loading}" decoding="async" alt="{html.escape(title)}" style="width:100%;height:auto;">',
+            unsafe_allow_html=True,
+        )
+        st.caption(title)
     else:
         st.warning(f"Image not found: {image_path}")
     
@@ -173,9 +194,73 @@ visuals = [
     )
 ]
 
-# Render each section
-for visual in visuals:
-    display_section(*visual)
+# Render each section, only the first image is loaded eagerly
+for i, visual in enumerate(visuals):
+    display_section(*visual, lazy=i > 0)
+
+# Interactive results
+st.markdown("""
+---
+
+### Explore the Results
+""")
+
+st.markdown("Every finding above comes from an interrupted time series regression or, for migration, a two-sample T-test run on each state. Use the filters below to see which states cross a given significance threshold for any metric, and how large the change was.")
+
+US_STATES_TOPOJSON = "https://cdn.jsdelivr.net/npm/vega-datasets@v1.29.0/data/us-10m.json"
+
+# The results table is keyed on its mtime so a redeploy with new results reloads it
+@st.cache_data(show_spinner=False)
+def load_results(mtime):
+    return read_results()
+
+# Filtering is memoized per filter combination, shared across sessions
+@st.cache_data(show_spinner=False)
+def filter_results(mtime, metric, intervention, alpha, regions):
+    results = load_results(mtime)
+    selected = results[(results["metric"] == metric)
+                       & (results["intervention"] == intervention)
+                       & results["region"].isin(regions)].copy()
+    selected["significant"] = selected["p_value"] < alpha
+    return selected.sort_values("coefficient")
+
+if os.path.exists(RESULTS_PATH):
+    results_mtime = os.path.getmtime(RESULTS_PATH)
+    results = load_results(results_mtime)
+
+    filter_cols = st.columns(4)
+    metrics = [m for m in METRIC_LABELS if m in set(results["metric"])]
+    metric = filter_cols[0].selectbox("Metric", metrics, format_func=METRIC_LABELS.get)
+    interventions = sorted(results.loc[results["metric"] == metric, "intervention"].unique(), reverse=True)
+    intervention = filter_cols[1].selectbox("Agreement", interventions)
+    alpha = filter_cols[2].selectbox("Significance threshold", [0.01, 0.05, 0.10], index=1, format_func=lambda a: f"p < {a:.2f}")
+    all_regions = sorted(results["region"].unique())
+    regions = filter_cols[3].multiselect("Regions", all_regions, default=all_regions)
+
+    selected = filter_results(results_mtime, metric, intervention, alpha, tuple(regions))
+    significant = selected[selected["significant"]]
+    st.markdown(f"**{len(significant)} of {len(selected)} states** saw a statistically significant change in {METRIC_LABELS[metric]} after {intervention} (p < {alpha:.2f}).")
+
+    # Choropleth: significant states are colored by the size of the change
+    us_states = alt.topo_feature(US_STATES_TOPOJSON, "states")
+    choropleth = alt.Chart(us_states).mark_geoshape(stroke="white").encode(
+        color=alt.condition("datum.significant", alt.Color("coefficient:Q", scale=alt.Scale(scheme="redblue", domainMid=0), title="Change"), alt.value("#e0e0e0")),
+        tooltip=[alt.Tooltip("state:N", title="State"), alt.Tooltip("coefficient:Q", title="Change", format=",.3f"), alt.Tooltip("p_value:Q", title="p-value", format=".4f")],
+    ).transform_lookup(
+        lookup="id", from_=alt.LookupData(selected, "fips", ["state", "coefficient", "p_value", "significant"])
+    ).transform_filter("isValid(datum.state)").project("albersUsa").properties(height=420)
+    st.altair_chart(choropleth, width="stretch")
+
+    # Bar chart of every selected state, significant ones highlighted
+    bars = alt.Chart(selected).mark_bar().encode(
+        x=alt.X("state:N", sort=None, title=None),
+        y=alt.Y("coefficient:Q", title="Change after " + intervention),
+        color=alt.condition("datum.significant", alt.value("#1f77b4"), alt.value("#c7c7c7")),
+        tooltip=[alt.Tooltip("state:N", title="State"), alt.Tooltip("region:N", title="Region"), alt.Tooltip("coefficient:Q", title="Change", format=",.3f"), alt.Tooltip("p_value:Q", title="p-value", format=".4f")],
+    ).properties(height=320)
+    st.altair_chart(bars, width="stretch")
+else:
+    st.warning(f"Results not found: {RESULTS_PATH}")
 
 # Conclusion
 st.markdown("""
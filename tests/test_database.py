@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, select, text
+
+from usmca import database
+from usmca.panel import read_panel
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'trade_impact.db'}")
+
+
+def read_table(engine, name):
+    ids = {v: k for k, v in database.state_ids(engine).items()}
+    with engine.connect() as conn:
+        df = pd.read_sql(select(database.data_tables[name]), conn)
+    df.insert(0, "state_name", df.pop("state_id").map(ids))
+    return df.drop(columns="record_id").sort_values(["state_name", "year"]).reset_index(drop=True)
+
+
+def expected_table(panel, name):
+    columns = database.TABLES[name]
+    df = panel[["state_name", "year"] + list(columns.values())].rename(
+        columns={v: k for k, v in columns.items()})
+    df = df.dropna(subset=list(columns), how="all").astype({"state_name": str})
+    return df.sort_values(["state_name", "year"]).reset_index(drop=True)
+
+
+def test_load_then_upsert(engine):
+    panel = read_panel()
+    database.load_panel(panel, engine)
+    for name in database.TABLES:
+        pd.testing.assert_frame_equal(read_table(engine, name), expected_table(panel, name),
+                                      check_dtype=False)
+
+    updated = panel.copy()
+    arizona = (updated["state_name"] == "Arizona") & (updated["year"] == 2022)
+    updated.loc[arizona, "real_gdp"] *= 1.1
+    # A row whose values all went missing must be removed, not left stale
+    ohio = (updated["state_name"] == "Ohio") & (updated["year"] == 2015)
+    updated.loc[ohio, "percent_born_mexico"] = np.nan
+    cells = pd.DataFrame({"state_name": ["Arizona", "Ohio"], "year": [2022, 2015],
+                          "metric": ["real_gdp", "percent_born_mexico"]})
+    database.upsert_panel(updated, cells, engine)
+
+    for name in database.TABLES:
+        pd.testing.assert_frame_equal(read_table(engine, name), expected_table(updated, name),
+                                      check_dtype=False)
+
+
+def test_upsert_reports_duplicate_rows(engine):
+    with engine.begin() as conn:
+        database.create_schema(conn)
+        for _ in range(2):
+            conn.execute(text("INSERT INTO migration_data (state_id, year, percent_born_mexico) "
+                              "VALUES (1, 2020, 1.5)"))
+
+    with pytest.raises(ValueError, match="migration_data"):
+        database.upsert_panel(read_panel(), engine=engine)
+
+    # A full reload replaces the duplicates
+    database.load_panel(read_panel(), engine)
+    database.upsert_panel(read_panel(), engine=engine)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from usmca.its import TERMS, fit_its
+
+smf = pytest.importorskip("statsmodels.formula.api")
+
+
+def make_panel(seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for state in ["Alpha", "Beta", "Gamma"]:
+        for year in range(2005, 2024):
+            rows.append({"state_name": state, "year": year,
+                         "gdp": 100 + 2 * (year - 2005) + 5 * (year >= 2020) + rng.normal(),
+                         "exports": rng.lognormal(3, 0.5)})
+    panel = pd.DataFrame(rows)
+    # Beta is missing a few years of GDP, Gamma has too few exports to fit
+    panel.loc[(panel["state_name"] == "Beta") & panel["year"].isin([2008, 2015, 2021]), "gdp"] = np.nan
+    panel.loc[(panel["state_name"] == "Gamma") & (panel["year"] < 2015), "exports"] = np.nan
+    return panel
+
+
+def test_fit_its_matches_statsmodels():
+    panel = make_panel()
+    results = fit_its(panel, 2020, ["gdp", "exports"], min_obs=10)
+
+    expected = []
+    for (state, metric), _ in panel.melt(["state_name", "year"]).groupby(["state_name", "variable"]):
+        data = panel.loc[panel["state_name"] == state, ["year", metric]].dropna()
+        if len(data) < 10:
+            continue
+        data = data.assign(post=(data["year"] >= 2020).astype(int), time=data["year"] - 2020)
+        model = smf.ols(f"{metric} ~ post + time", data=data).fit()
+        expected.append((state, metric, len(data), model))
+
+    assert len(results) == len(expected) == 5
+    assert ("Gamma", "exports") not in set(zip(results["state"], results["metric"]))
+    for state, metric, n_obs, model in expected:
+        row = results[(results["state"] == state) & (results["metric"] == metric)].iloc[0]
+        assert row["n_obs"] == n_obs
+        for term, name in zip(TERMS, ["Intercept", "post", "time"]):
+            assert row[f"coef_{term}"] == pytest.approx(model.params[name], rel=1e-8)
+            assert row[f"se_{term}"] == pytest.approx(model.bse[name], rel=1e-8)
+            assert row[f"p_value_{term}"] == pytest.approx(model.pvalues[name], rel=1e-6, abs=1e-12)
+
+
+def test_fit_its_rejects_duplicate_rows():
+    panel = make_panel()
+    with pytest.raises(ValueError):
+        fit_its(pd.concat([panel, panel.head(1)]), 2020, ["gdp"])
@@ -0,0 +1,49 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from usmca import loaders
+from usmca.sources import DATA_DIR
+
+JOB_GROWTH_DIR = os.path.join(DATA_DIR, "Job_Growth_Data")
+FOUR_QUARTERS, EIGHT_QUARTERS = sorted(loaders.FORMATION_FOLDERS, key=loaders.FORMATION_FOLDERS.get)
+
+
+def test_second_load_reads_the_cache(tmp_path):
+    paths = [os.path.join(JOB_GROWTH_DIR, f"job_growth_{year}.xls") for year in (2019, 2020)]
+    first = loaders.load_files(paths, loaders.parse_job_growth, cache_dir=tmp_path)
+    assert len(os.listdir(tmp_path)) == 2
+
+    def parse_job_growth(path):
+        raise AssertionError(f"{path} was parsed again")
+
+    second = loaders.load_files(paths, parse_job_growth, cache_dir=tmp_path)
+    for before, after in zip(first, second):
+        pd.testing.assert_frame_equal(before, after)
+
+
+def test_copied_file_gets_its_own_cache_entry(tmp_path):
+    src = os.path.join(JOB_GROWTH_DIR, "job_growth_2020.xls")
+    copy = tmp_path / "job_growth_2099.xls"
+    shutil.copy(src, copy)
+    frames = loaders.load_files([src, str(copy)], loaders.parse_job_growth,
+                                cache_dir=tmp_path / "cache")
+    assert [df["year"].iloc[0] for df in frames] == [2020, 2099]
+
+
+def test_file_in_the_wrong_quarters_folder_raises(tmp_path):
+    for folder in loaders.FORMATION_FOLDERS:
+        os.makedirs(tmp_path / folder)
+    shutil.copy(os.path.join(DATA_DIR, FOUR_QUARTERS, "arizona_business_formations.csv"),
+                tmp_path / EIGHT_QUARTERS)
+    with pytest.raises(ValueError, match="arizona_business_formations.csv"):
+        loaders.load_business_startups(str(tmp_path), cache_dir=tmp_path / "cache")
+
+
+def test_non_numeric_job_growth_raises(tmp_path, monkeypatch):
+    sheet = pd.DataFrame({"State": ["Alabama", "Alaska"], "% Change": [1.5, "n/a"]})
+    monkeypatch.setattr(loaders.pd, "read_excel", lambda *args, **kwargs: sheet.copy())
+    with pytest.raises(ValueError, match="% Change"):
+        loaders.parse_job_growth(str(tmp_path / "job_growth_2020.xls"))
@@ -0,0 +1,68 @@
+import os
+import shutil
+
+import pandas as pd
+
+from usmca import pipeline
+from usmca.panel import read_panel
+from usmca.results import read_results
+from usmca.sources import DATA_DIR
+
+# Outputs the pipeline writes, everything else under data/ is a source
+OUTPUTS = {".cache", "panel.arrow", "results.csv", "robustness.csv", "trade.arrow",
+           "benchmark_baseline.json"}
+
+
+def copy_sources(dest):
+    shutil.copytree(DATA_DIR, dest, ignore=lambda _, names: [n for n in names if n in OUTPUTS])
+    return str(dest)
+
+
+def edit_gdp(data_dir):
+    path = os.path.join(data_dir, "Real_GDP_by_State.csv")
+    gdp = pd.read_csv(path)
+    gdp.loc[gdp["State"] == "Arizona", "2022"] *= 1.1
+    gdp.to_csv(path, index=False)
+
+
+def test_incremental_run_matches_full_rebuild(tmp_path):
+    incremental = copy_sources(tmp_path / "incremental")
+    pipeline.run(incremental, force=True)
+    edit_gdp(incremental)
+    summary = pipeline.run(incremental)
+
+    assert summary["sources"] == ["gdp"]
+    assert set(summary["changed"]["state_name"]) == {"Arizona"}
+    assert 0 < summary["refit"] < len(read_results(os.path.join(incremental, "results.csv")))
+
+    full = copy_sources(tmp_path / "full")
+    edit_gdp(full)
+    pipeline.run(full, force=True)
+
+    pd.testing.assert_frame_equal(read_panel(path=os.path.join(incremental, "panel.arrow")),
+                                  read_panel(path=os.path.join(full, "panel.arrow")))
+    pd.testing.assert_frame_equal(read_results(os.path.join(incremental, "results.csv")),
+                                  read_results(os.path.join(full, "results.csv")))
+
+
+def test_unchanged_sources_are_not_reread(tmp_path):
+    data_dir = copy_sources(tmp_path / "data")
+    pipeline.run(data_dir, force=True)
+    summary = pipeline.run(data_dir)
+    assert summary["sources"] == []
+    assert summary["refit"] == 0
+
+
+def cache_entries(data_dir):
+    cache_dir = os.path.join(data_dir, ".cache")
+    return set(os.listdir(cache_dir)) if os.path.isdir(cache_dir) else set()
+
+
+def test_loader_cache_stays_in_data_dir(tmp_path):
+    before = cache_entries(DATA_DIR)
+    data_dir = copy_sources(tmp_path / "data")
+    pipeline.run(data_dir, force=True)
+
+    prefixes = {name.split("-")[0] for name in cache_entries(data_dir)}
+    assert {"job_growth", "business_formations"} <= prefixes
+    assert cache_entries(DATA_DIR) == before
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from usmca import robustness
+from usmca.its import to_arrays
+
+STATES = ["Alpha", "Beta", "Gamma", "Delta", "Epsilon"]
+
+
+def make_panel(seed=0, states=STATES):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i, state in enumerate(states):
+        for year in range(2005, 2024):
+            rows.append({"state_name": state, "year": year,
+                         "gdp": 100 * (i + 1) + 2 * (year - 2005) + 5 * (year >= 2020) + rng.normal(),
+                         "trade_balance": rng.normal(0, 10)})
+    return pd.DataFrame(rows)
+
+
+def test_block_resample_keeps_shape_and_draws_from_each_series():
+    rng = np.random.default_rng(0)
+    # Every residual encodes its (state, year, metric) position
+    s, y, m = np.meshgrid(np.arange(4), np.arange(11), np.arange(2), indexing="ij")
+    resid = 1000 * s + 10 * y + m + 1.0
+    resid[0, 5, 1] = np.nan
+
+    sample = robustness.block_resample(resid, rng, block_length=3)
+    assert sample.shape == resid.shape
+    # Draws stay within their own state and metric and come from real years
+    np.testing.assert_array_equal(sample // 1000, s)
+    np.testing.assert_array_equal(sample % 10, np.where(sample == 0, 0, m + 1))
+    years = (sample % 1000) // 10
+    assert ((years >= 0) & (years < 11)).all()
+
+
+def test_synthetic_weights_are_a_convex_combination():
+    rng = np.random.default_rng(1)
+    donors = rng.normal(size=(12, 6))
+    treated = donors @ np.array([0.5, 0.3, 0.2, 0, 0, 0])
+    weights = robustness.synthetic_weights(treated, donors)
+    assert (weights >= 0).all()
+    assert weights.sum() == pytest.approx(1)
+    np.testing.assert_allclose(weights, [0.5, 0.3, 0.2, 0, 0, 0], atol=1e-3)
+
+    # A path outside the donors' hull still gets valid weights
+    weights = robustness.synthetic_weights(treated + 100, donors)
+    assert (weights >= 0).all()
+    assert weights.sum() == pytest.approx(1)
+
+
+def test_placebo_test_needs_enough_placebos():
+    # 15 pre-period years leave 10 placebo years per state
+    _, years, values = to_arrays(make_panel(states=STATES[:1]), ["gdp"])
+    _, p_value = robustness.placebo_test(years, values, 2020, alpha=0.05)
+    assert np.isnan(p_value).all()
+
+    _, years, values = to_arrays(make_panel(states=STATES[:3]), ["gdp", "trade_balance"])
+    _, p_value = robustness.placebo_test(years, values, 2020, alpha=0.05)
+    assert ((p_value > 0) & (p_value <= 1)).all()
+
+
+def test_results_do_not_depend_on_max_workers():
+    panel = make_panel()
+    kwargs = dict(intervention_year=2020, metrics=["gdp", "trade_balance"], n_boot=150, seed=3)
+    one = robustness.run_robustness(panel, max_workers=1, **kwargs)
+    two = robustness.run_robustness(panel, max_workers=2, **kwargs)
+
+    pd.testing.assert_frame_equal(one, two)
+    assert set(one["method"]) == {"placebo", "bootstrap", "synthetic"}
+    assert one["p_value"].between(0, 1, inclusive="right").all()
@@ -0,0 +1,23 @@
+import os
+
+from PIL import Image
+
+from usmca.thumbnails import make_thumbnails
+
+
+def test_thumbnails_are_capped_deduplicated_and_replaced(tmp_path):
+    image_path = tmp_path / "chart.png"
+    Image.new("RGB", (700, 350)).save(image_path)
+    out_dir = tmp_path / "thumbnails"
+
+    first = make_thumbnails(str(image_path), out_dir, widths=(480, 960, 1440))
+    assert [(w, h) for _, w, h in first] == [(480, 240), (700, 350)]
+    # Another image whose name starts with the same stem is left alone
+    other = out_dir / "chart-extra-1-480w.webp"
+    other.touch()
+
+    mtime = os.path.getmtime(image_path) + 60
+    os.utime(image_path, (mtime, mtime))
+    second = make_thumbnails(str(image_path), out_dir)
+    assert sorted(os.listdir(out_dir)) == sorted([name for name, _, _ in second] + [other.name])
+    assert {name for name, _, _ in first}.isdisjoint(os.listdir(out_dir))
@@ -0,0 +1,73 @@
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from usmca import trade
+
+HEADER = ["Product ", "State", "Unit", "Exports", "Country", "2023", "2024"]
+ROWS = [
+    ["0--All Merchandise", "Alabama", "Millions of USD", "Exports", "Mexico", "$4,201 ", "$3 "],
+    ["0--All Merchandise", "Alaska", "Thousands of USD", "Exports", "Mexico", "$1,500 ", "-$20 "],
+    ["0--All Merchandise", "Arizona", "Millions of USD", "Exports", "Mexico", "$1.5 Billion", "(D)"],
+    ["0--All Merchandise", "Total", "Millions of USD", "Exports", "Mexico", "$9,999 ", "$9 "],
+]
+
+
+def write_export(path, rows=ROWS, sep="\t", encoding="utf-16"):
+    lines = [sep.join(row) for row in [HEADER] + rows]
+    with open(path, "w", encoding=encoding, newline="") as f:
+        f.write("\n".join(lines) + "\n")
+    return str(path)
+
+
+def read_batches(path, **kwargs):
+    return pa.Table.from_batches(list(trade.iter_chunks(path, **kwargs)), schema=trade.SCHEMA)
+
+
+def test_parse_currency():
+    values = ["$4,201 Million", "-$5", "$-5", "$1.5 Billion", "$250 Thousand", " 7 ",
+              "--4", "-$-4", "(D)", "", "$3 Zillion"]
+    expected = [4201, -5, -5, 1500, 0.25, 7] + [np.nan] * 5
+    np.testing.assert_array_equal(trade.parse_currency(values), expected)
+    # The scale only applies to plain numbers
+    np.testing.assert_array_equal(trade.parse_currency(["7", "$2 Million"], np.array([1e-3, 1e-3])),
+                                  [0.007, 2])
+
+
+def test_unit_scale():
+    units = ["Millions of USD", " thousands of US Dollars", "USD", "Billions of USD"]
+    np.testing.assert_array_equal(trade.unit_scale(units, "f.csv"), [1, 1e-3, 1e-6, 1e3])
+    with pytest.raises(ValueError, match="f.csv: unrecognised units \\['Metric Tons'\\]"):
+        trade.unit_scale(["Millions of USD", "Metric Tons"], "f.csv")
+
+
+@pytest.mark.parametrize("encoding,sep", [("utf-16", "\t"), ("utf-8-sig", ","), ("utf-8", "\t")])
+def test_encoding_and_delimiter_detection(tmp_path, encoding, sep):
+    rows = [[v.replace(",", "") for v in row] for row in ROWS] if sep == "," else ROWS
+    path = write_export(tmp_path / "exports.csv", rows, sep=sep, encoding=encoding)
+    assert trade.detect_encoding(path) == encoding
+    df = read_batches(path).to_pandas()
+
+    assert list(df["state_name"].astype(str).unique()) == ["Alabama", "Alaska", "Arizona"]
+    assert set(df["flow"]) == {"Exports"} and set(df["partner"]) == {"Mexico"}
+    np.testing.assert_array_equal(df["value"], [4201, 3, 1.5, -0.02, 1500, np.nan])
+
+
+def test_unrecognised_unit_raises(tmp_path):
+    rows = ROWS + [["0--All Merchandise", "Ohio", "Metric Tons", "Exports", "Mexico", "1", "2"]]
+    path = write_export(tmp_path / "exports.csv", rows)
+    with pytest.raises(ValueError, match="Metric Tons"):
+        read_batches(path)
+
+
+def test_chunked_read_matches_single_chunk(tmp_path):
+    path = write_export(tmp_path / "exports.csv")
+    whole = read_batches(path)
+    assert len(list(trade.iter_chunks(path, chunksize=1))) == len(ROWS)
+    assert read_batches(path, chunksize=1).equals(whole)
+    assert read_batches(path, chunksize=3).equals(whole)
+
+    store = tmp_path / "trade.arrow"
+    assert trade.ingest([path, path], str(store), chunksize=1) == 2 * whole.num_rows
+    with pa.memory_map(str(store)) as source:
+        assert pa.ipc.open_file(source).read_all().equals(pa.concat_tables([whole, whole]))
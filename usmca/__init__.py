@@ -0,0 +1 @@
+"""Reusable analysis code for the NAFTA vs USMCA state-level project."""
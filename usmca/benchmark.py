@@ -0,0 +1,383 @@
+"""Benchmarks for the ingestion -> analysis -> render path.
+
+Every stage runs on synthetic data shaped like the real ``data/`` files and
+scaled up by a factor: ``scale`` multiplies the number of states (50 ->
+county-level is roughly 60x) and the number of trade products (the industry
+file's ~32 -> HS6 is roughly 150x); ``--years`` multiplies the year span.
+The stages are
+
+- ``ingest``: ``trade.ingest`` on UTF-16 ITA industry exports. The trade
+  store only holds the 50 states, so here the scale applies to products.
+- ``melt_join``: melting the wide sources and joining them into the dense
+  panel, then computing the derived metrics (the notebook's melt/merge chain
+  into ``trade_impact_df``).
+- ``its``: the batched ITS fit over every state and the report's metrics.
+- ``industry_its``: the batched ITS fit over every state x product x flow.
+- ``industry_loop``: the notebook's ``groupby`` + ``smf.ols`` loop over the
+  same series, run on at most ``LOOP_SERIES`` of them so it stays usable
+  as a reference at any scale. Compare ``seconds / series``.
+- ``thumbnails_cold`` / ``thumbnails_warm``: encoding the app's images, and
+  the per-rerun lookup once the thumbnails exist. These do not scale and
+  only run at the first scale.
+
+Each stage is timed ``repeat`` times (median wall and CPU time, and the
+spread between the fastest and slowest run) and then run once more in a
+forked process to measure the peak resident memory it adds, so NumPy,
+Arrow and Pillow buffers all count (this needs a Unix ``fork``). The
+report is written as JSON, and any stage slower or hungrier than the
+stored baseline by more than the tolerance and the noise floor makes the
+run fail::
+
+    python -m usmca.benchmark --scales 1 10 100
+    python -m usmca.benchmark --scales 1 10 100 --update-baseline
+
+Baselines are machine-specific; regenerate it on the machine that checks
+against it.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from usmca import trade
+from usmca.its import USMCA_YEAR, fit_its
+from usmca.loaders import CACHE_DIR
+from usmca.panel import METRICS, add_derived, empty_panel, join_frames
+from usmca.results import TESTS
+from usmca.sources import DATA_DIR, melt_years
+from usmca.states import STATE_NAMES
+from usmca.thumbnails import make_thumbnails
+
+BASELINE_PATH = os.path.join(DATA_DIR, "benchmark_baseline.json")
+REPORT_PATH = os.path.join(CACHE_DIR, "benchmark.json")
+IMAGE_DIR = os.path.join(os.path.dirname(DATA_DIR), "images")
+
+# Real sizes the scale factors multiply
+FIRST_YEAR, LAST_YEAR = 1990, 2024
+INDUSTRY_YEARS = range(2009, 2025)
+N_PRODUCTS = 32
+FLOWS = ["Imports", "Exports"]
+
+# Metrics read from wide sources, the others are derived from them
+RAW_METRICS = [m for m in METRICS if m not in ("inflation_rate", "cpi_proxy", "trade_balance")]
+ITS_METRICS = TESTS[0][1]
+LOOP_SERIES = 200
+
+SCALES = (1, 10, 100)
+REPEAT = 5
+# A stage regresses if it is this much slower (or bigger) than the baseline
+# and the difference is larger than the noise floor. The time floor is
+# MIN_SECONDS or SPREAD_FACTOR times the larger run-to-run spread of the two
+# runs, whichever is bigger. Forked children add ~20 MB of copy-on-write
+# pages to any stage's memory.
+TOLERANCE = 0.5
+MIN_SECONDS = 0.1
+SPREAD_FACTOR = 3
+MIN_MB = 25.0
+
+# ru_maxrss is in kilobytes on Linux and bytes on macOS
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def synthetic_states(n_states):
+    """The 50 state names, or made-up area names if more are asked for."""
+    if n_states <= len(STATE_NAMES):
+        return STATE_NAMES[:n_states]
+    return [f"Area {i:06d}" for i in range(n_states)]
+
+
+def synthetic_years(year_scale, last_year=LAST_YEAR, first_year=FIRST_YEAR):
+    """The real year span stretched ``year_scale`` times back in time."""
+    n_years = (last_year - first_year + 1) * year_scale
+    return list(range(last_year - n_years + 1, last_year + 1))
+
+
+def synthetic_series(rng, n_series, n_years, intervention_index):
+    """Trending random walks with a level shift at ``intervention_index``."""
+    level = rng.lognormal(8, 1.5, size=(n_series, 1))
+    steps = rng.normal(0.02, 0.05, size=(n_series, n_years))
+    shift = np.zeros(n_years)
+    shift[intervention_index:] = 1
+    shift = shift * rng.normal(0, 0.1, size=(n_series, 1))
+    return level * np.exp(np.cumsum(steps, axis=1) + shift)
+
+
+def synthetic_wide(states, years, rng):
+    """One wide frame per raw metric, laid out like the BEA files."""
+    frames = {}
+    for metric in RAW_METRICS:
+        values = synthetic_series(rng, len(states), len(years), years.index(USMCA_YEAR))
+        df = pd.DataFrame(values, columns=[str(y) for y in years])
+        df.insert(0, "State", states)
+        frames[metric] = df
+    return frames
+
+
+def synthetic_panel(states, years, rng):
+    """A dense long panel with every column of ``panel.METRICS``."""
+    index = pd.MultiIndex.from_product([states, years], names=["state_name", "year"])
+    panel = pd.DataFrame(index=index).reset_index()
+    panel["state_name"] = pd.Categorical(panel["state_name"], categories=states)
+    for metric in METRICS:
+        values = synthetic_series(rng, len(states), len(years), years.index(USMCA_YEAR))
+        panel[metric] = values.ravel()
+    return panel
+
+
+def synthetic_industry(n_products, years, rng):
+    """Long state x product x flow x year trade values for the 50 states."""
+    products = [f"{i:06d}--Product {i}" for i in range(n_products)]
+    keys = pd.MultiIndex.from_product([STATE_NAMES, products, FLOWS],
+                                      names=["State", "Product", "Flow"]).to_frame(index=False)
+    values = synthetic_series(rng, len(keys), len(years), list(years).index(USMCA_YEAR))
+    df = pd.DataFrame(values, columns=[str(y) for y in years])
+    return pd.concat([keys, df], axis=1)
+
+
+def write_industry_csv(industry, path):
+    """Write ``synthetic_industry`` output as a UTF-16 ITA export."""
+    df = industry.copy()
+    year_cols = [c for c in df.columns if c.isdigit()]
+    for col in year_cols:
+        df[col] = "$" + df[col].round(1).map("{:,}".format) + " Million"
+    df = df[["Product", "Flow", "State"] + year_cols]
+    df.to_csv(path, sep="\t", index=False, encoding="utf-16")
+
+
+def melt_join(wide, states, years):
+    """Melt every wide source and join them into the panel."""
+    frames = []
+    for metric, df in wide.items():
+        long_df = melt_years(df, metric)
+        long_df["year"] = long_df["year"].astype(int)
+        frames.append(long_df)
+    panel = empty_panel(years[0], years[-1], states)
+    return add_derived(join_frames(panel, frames))
+
+
+def industry_its(industry):
+    """Batched ITS over every state x product x flow series."""
+    long_df = industry.melt(id_vars=["State", "Product", "Flow"],
+                            var_name="year", value_name="trade_value")
+    long_df["year"] = long_df["year"].astype(int)
+    long_df["series"] = long_df.groupby(["State", "Product", "Flow"], sort=False).ngroup()
+    return fit_its(long_df, USMCA_YEAR, ["trade_value"], state_col="series")
+
+
+def industry_loop(industry):
+    """The notebook's per-product ``smf.ols`` loop, for comparison."""
+    import statsmodels.formula.api as smf
+
+    long_df = industry.melt(id_vars=["State", "Product", "Flow"],
+                            var_name="year", value_name="trade_value")
+    long_df["year"] = long_df["year"].astype(int)
+    results = []
+    for (state, product, flow), group in long_df.groupby(["State", "Product", "Flow"]):
+        group = group.assign(post=(group["year"] >= USMCA_YEAR).astype(int),
+                             time=group["year"] - USMCA_YEAR)
+        group = group.dropna(subset=["trade_value"])
+        if group.shape[0] < 10:
+            continue
+        model = smf.ols("trade_value ~ post + time", data=group).fit()
+        results.append((state, product, flow, model.params["post"], model.pvalues["post"]))
+    return results
+
+
+def _peak_child(run, conn):
+    # A forked child starts with its own RSS high-water mark, so the growth
+    # of ru_maxrss is the stage's own peak, native allocations included
+    try:
+        before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        run()
+        after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        conn.send((after - before) * RSS_UNIT / 2**20)
+    except BaseException as exc:
+        conn.send(exc)
+        raise
+
+
+def peak_mb(run):
+    """Peak resident memory ``run`` adds, measured in a forked process."""
+    ctx = multiprocessing.get_context("fork")
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_peak_child, args=(run, sender))
+    process.start()
+    result = receiver.recv()
+    process.join()
+    if isinstance(result, BaseException):
+        raise result
+    return result
+
+
+def measure(run, repeat=REPEAT):
+    """Median wall and CPU seconds of ``repeat`` calls, and peak memory in MB."""
+    wall, cpu = [], []
+    for _ in range(repeat):
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        run()
+        wall.append(time.perf_counter() - start_wall)
+        cpu.append(time.process_time() - start_cpu)
+    return {"seconds": float(np.median(wall)), "cpu_seconds": float(np.median(cpu)),
+            "spread_seconds": max(wall) - min(wall), "peak_mb": peak_mb(run)}
+
+
+def stages(scale, year_scale, work_dir, seed=0, images=True):
+    """Yield ``(name, sizes, run)`` for every stage at one scale.
+
+    Inputs are generated before each stage is yielded, so only ``run`` is
+    measured.
+    """
+    rng = np.random.default_rng(seed)
+    states = synthetic_states(len(STATE_NAMES) * scale)
+    years = synthetic_years(year_scale)
+    industry_years = synthetic_years(year_scale, INDUSTRY_YEARS[-1], INDUSTRY_YEARS[0])
+    n_products = N_PRODUCTS * scale
+    panel_sizes = {"states": len(states), "years": len(years), "products": 0}
+    industry_sizes = {"states": len(STATE_NAMES), "years": len(industry_years),
+                      "products": n_products}
+
+    industry = synthetic_industry(n_products, industry_years, rng)
+    csv_path = os.path.join(work_dir, f"industry_{scale}x.csv")
+    write_industry_csv(industry, csv_path)
+    store_path = os.path.join(work_dir, "trade.arrow")
+    yield ("ingest", {**industry_sizes, "rows": len(industry) * len(industry_years)},
+           lambda: trade.ingest([csv_path], store_path))
+    os.remove(csv_path)
+
+    wide = synthetic_wide(states, years, rng)
+    yield ("melt_join", {**panel_sizes, "rows": len(states) * len(years)},
+           lambda: melt_join(wide, states, years))
+    del wide
+
+    panel = synthetic_panel(states, years, rng)
+    yield ("its", {**panel_sizes, "series": len(states) * len(ITS_METRICS)},
+           lambda: fit_its(panel, USMCA_YEAR, ITS_METRICS))
+    del panel
+
+    yield ("industry_its", {**industry_sizes, "series": len(industry)},
+           lambda: industry_its(industry))
+    sample = industry.iloc[:LOOP_SERIES]
+    yield ("industry_loop", {**industry_sizes, "series": len(sample)},
+           lambda: industry_loop(sample))
+    del industry
+
+    if images:
+        paths = sorted(os.path.join(IMAGE_DIR, f) for f in os.listdir(IMAGE_DIR)
+                       if f.endswith(".png"))
+        image_sizes = {"images": len(paths)}
+
+        def cold():
+            out_dir = tempfile.mkdtemp(dir=work_dir)
+            for path in paths:
+                make_thumbnails(path, out_dir)
+            shutil.rmtree(out_dir)
+
+        warm_dir = os.path.join(work_dir, "thumbnails")
+        for path in paths:
+            make_thumbnails(path, warm_dir)
+        yield ("thumbnails_cold", image_sizes, cold)
+        yield ("thumbnails_warm", image_sizes,
+               lambda: [make_thumbnails(path, warm_dir) for path in paths])
+
+
+def run_benchmarks(scales=SCALES, year_scale=1, repeat=REPEAT, seed=0, log=print):
+    """Measure every stage at every scale and return the report dict."""
+    records = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for i, scale in enumerate(scales):
+            for name, sizes, run in stages(scale, year_scale, work_dir, seed, images=i == 0):
+                record = {"stage": name, "scale": scale, "year_scale": year_scale,
+                          **sizes, **measure(run, repeat)}
+                records.append(record)
+                log(f"{name:16} {scale:>5}x  {record['seconds']:9.3f}s  "
+                    f"{record['cpu_seconds']:9.3f}s cpu  {record['peak_mb']:9.1f} MB")
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "stages": records,
+    }
+
+
+def _key(record):
+    return (record["stage"], record["scale"], record["year_scale"])
+
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    """Stages of ``report`` that regressed against ``baseline``.
+
+    Returns one message per regression. Stages missing from the baseline
+    are not compared.
+    """
+    expected = {_key(r): r for r in baseline["stages"]}
+    regressions = []
+    for record in report["stages"]:
+        base = expected.get(_key(record))
+        if base is None:
+            continue
+        spread = max(record["spread_seconds"], base.get("spread_seconds", 0))
+        time_floor = max(MIN_SECONDS, SPREAD_FACTOR * spread)
+        for field, floor, unit in (("seconds", time_floor, "s"), ("peak_mb", MIN_MB, " MB")):
+            now, before = record[field], base[field]
+            if now > before * (1 + tolerance) and now - before > floor:
+                regressions.append(
+                    f"{record['stage']} at {record['scale']}x: {field} "
+                    f"{before:.3f}{unit} -> {now:.3f}{unit}")
+    return regressions
+
+
+def write_report(report, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES),
+                        help="factors applied to the number of states and products")
+    parser.add_argument("--years", type=int, default=1,
+                        help="factor applied to the number of years")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--output", default=REPORT_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store this run as the baseline instead of checking against it")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.scales, args.years, args.repeat)
+    write_report(report, args.output)
+    print(f"Wrote {len(report['stages'])} stage timings to {args.output}")
+
+    if args.update_baseline:
+        write_report(report, args.baseline)
+        print(f"Updated the baseline in {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --update-baseline to store one")
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(report, json.load(f), args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""Bulk loading of the panel into the ``trade_impact`` database.
+
+All access goes through one pooled engine. A full reload truncates the data
+tables and streams every table in with ``COPY FROM STDIN`` inside a single
+transaction. ``upsert_panel`` writes only the given rows with
+``INSERT ... ON CONFLICT (state_id, year) DO UPDATE``, so an incremental
+refresh from ``usmca.pipeline`` touches just the cells that changed.
+
+PostgreSQL is the target. SQLite works as a local stand-in, using batched
+``executemany`` inserts instead of ``COPY``. The connection URL comes from
+the ``DATABASE_URL`` environment variable::
+
+    DATABASE_URL=postgresql://postgres:<password>@localhost:5432/trade_impact python -m usmca.database
+"""
+
+import csv
+import functools
+import io
+import os
+
+import pandas as pd
+from sqlalchemy import (Column, ForeignKey, Integer, MetaData, Numeric, String,
+                        Table, UniqueConstraint, bindparam, create_engine, inspect,
+                        select, text)
+from sqlalchemy.dialects import sqlite
+
+from usmca.panel import read_panel
+from usmca.states import STATES
+
+DEFAULT_URL = "postgresql://postgres@localhost:5432/trade_impact"
+BATCH_SIZE = 5_000
+
+# Database table -> {database column: panel column}
+TABLES = {
+    "gdp_data": {
+        "nominal_gdp": "nominal_gdp",
+        "real_gdp": "real_gdp",
+        "inflation_rate": "inflation_rate",
+    },
+    "cpi_proxy_data": {
+        "real_personal_income": "per_capita_personal_income",
+        "real_personal_consumption": "per_capita_personal_consumption",
+        "cpi_proxy_value": "cpi_proxy",
+    },
+    "migration_data": {"percent_born_mexico": "percent_born_mexico"},
+    "trade_data": {
+        "exports_to_mexico": "exports",
+        "imports_from_mexico": "imports",
+        "trade_balance": "trade_balance",
+    },
+    "business_startups": {"number_of_startups": "number_of_startups"},
+    "job_growth_data": {"job_growth": "job_growth_percent_change"},
+}
+
+metadata = MetaData()
+
+states_table = Table(
+    "states", metadata,
+    Column("state_id", Integer, primary_key=True),
+    Column("state_name", String(50), unique=True, nullable=False),
+    Column("region", String(50)),
+    UniqueConstraint("state_name", "region", name="unique_state_region"),
+)
+
+# The notebook declared some of these columns INTEGER, which truncated
+# percentages and per-quarter averages, so every value column is NUMERIC here.
+# create_schema converts the columns of tables the notebook already created.
+data_tables = {
+    name: Table(
+        name, metadata,
+        Column("record_id", Integer, primary_key=True),
+        Column("state_id", Integer, ForeignKey("states.state_id")),
+        Column("year", Integer, nullable=False),
+        *[Column(col, Numeric(asdecimal=False)) for col in columns],
+    )
+    for name, columns in TABLES.items()
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_engine(url=None):
+    """The shared, pooled engine for ``url`` (default ``DATABASE_URL``)."""
+    url = url or os.environ.get("DATABASE_URL", DEFAULT_URL)
+    return create_engine(url, pool_pre_ping=True)
+
+
+def create_schema(conn):
+    """Create any missing tables, widen old INTEGER value columns and add the states."""
+    metadata.create_all(conn)
+    if conn.dialect.name == "postgresql":
+        inspector = inspect(conn)
+        for name, columns in TABLES.items():
+            types = {c["name"]: c["type"] for c in inspector.get_columns(name)}
+            for column in columns:
+                if not isinstance(types[column], Numeric):
+                    conn.execute(text(f"ALTER TABLE {name} ALTER COLUMN {column} "
+                                      f"TYPE NUMERIC USING {column}::NUMERIC"))
+
+    existing = set(conn.execute(select(states_table.c.state_name)).scalars())
+    missing = [{"state_name": n, "region": r} for n, r in STATES if n not in existing]
+    if missing:
+        conn.execute(states_table.insert(), missing)
+
+
+def create_indexes(conn):
+    """Add the (state_id, year) unique index every upsert relies on.
+
+    Raises ValueError if a table holds duplicate (state_id, year) rows, as
+    repeated notebook appends leave behind; ``load_panel`` replaces them.
+    """
+    for name in TABLES:
+        duplicates = conn.execute(text(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM {name} GROUP BY state_id, year "
+            f"HAVING COUNT(*) > 1) AS d")).scalar()
+        if duplicates:
+            raise ValueError(f"{name}: {duplicates} (state_id, year) pairs have duplicate "
+                             f"rows; run load_panel() to reload the table")
+        conn.execute(text(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {name}_state_year ON {name} (state_id, year)"))
+
+
+@functools.lru_cache(maxsize=None)
+def state_ids(engine):
+    """state_name -> state_id from the states table, read once per engine."""
+    with engine.begin() as conn:
+        create_schema(conn)
+        rows = conn.execute(select(states_table.c.state_name, states_table.c.state_id))
+        return dict(rows.all())
+
+
+def table_rows(panel, table, ids, dropna=True):
+    """Rows of ``table`` taken from the panel, without all-missing rows if ``dropna``."""
+    columns = TABLES[table]
+    df = panel[["state_name", "year"] + list(columns.values())]
+    df = df.rename(columns={v: k for k, v in columns.items()})
+    if dropna:
+        df = df.dropna(subset=list(columns), how="all")
+    df.insert(0, "state_id", df.pop("state_name").astype(str).map(ids).astype(int))
+    df["year"] = df["year"].astype(int)
+    return df.reset_index(drop=True)
+
+
+def _copy(conn, table, df):
+    # Stream the rows through COPY FROM STDIN as CSV, empty fields are NULL
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False, quoting=csv.QUOTE_MINIMAL)
+    buf.seek(0)
+    sql = f"COPY {table} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv)"
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(sql, buf)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buf.getvalue())
+    finally:
+        cursor.close()
+
+
+def _records(df):
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def _upsert(conn, table, df):
+    dialect = conn.dialect.name
+    value_cols = [c for c in df.columns if c not in ("state_id", "year")]
+
+    if dialect == "postgresql":
+        # COPY into a staging table, then merge it in with one statement
+        stage = f"{table}_stage"
+        cols = ", ".join(df.columns)
+        conn.execute(text(f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+                          f"SELECT {cols} FROM {table} WITH NO DATA"))
+        _copy(conn, stage, df)
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in value_cols)
+        conn.execute(text(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {stage} "
+                          f"ON CONFLICT (state_id, year) DO UPDATE SET {updates}"))
+        conn.execute(text(f"DROP TABLE {stage}"))
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(data_tables[table])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["state_id", "year"],
+            set_={c: stmt.excluded[c] for c in value_cols})
+        records = _records(df)
+        for start in range(0, len(records), BATCH_SIZE):
+            conn.execute(stmt, records[start:start + BATCH_SIZE])
+    else:
+        raise ValueError(f"upserts are not supported on {dialect}")
+
+
+def load_panel(panel=None, engine=None):
+    """Replace every data table with the panel's values in one transaction."""
+    panel = read_panel() if panel is None else panel
+    engine = engine or get_engine()
+    ids = state_ids(engine)
+
+    with engine.begin() as conn:
+        create_schema(conn)
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY"))
+        else:
+            for name in TABLES:
+                conn.execute(data_tables[name].delete())
+
+        create_indexes(conn)
+
+        for name in TABLES:
+            df = table_rows(panel, name, ids)
+            if conn.dialect.name == "postgresql":
+                _copy(conn, name, df)
+            else:
+                records = _records(df)
+                for start in range(0, len(records), BATCH_SIZE):
+                    conn.execute(data_tables[name].insert(), records[start:start + BATCH_SIZE])
+
+
+def upsert_panel(panel, cells=None, engine=None):
+    """Insert or update panel rows in one transaction.
+
+    ``cells`` is the ``changed`` frame from ``usmca.pipeline.run`` (one row per
+    state, year and metric). When given, only tables with a changed metric
+    and only the changed (state, year) rows are written. Rows whose values
+    are now all missing are deleted, as ``load_panel`` would leave them out.
+    """
+    engine = engine or get_engine()
+    ids = state_ids(engine)
+
+    with engine.begin() as conn:
+        create_schema(conn)
+        create_indexes(conn)
+        for name, columns in TABLES.items():
+            df = panel
+            if cells is not None:
+                touched = cells[cells["metric"].isin(columns.values())]
+                if touched.empty:
+                    continue
+                keys = pd.MultiIndex.from_frame(touched[["state_name", "year"]].astype({"state_name": str}))
+                rows = pd.MultiIndex.from_arrays([panel["state_name"].astype(str), panel["year"]])
+                df = panel[rows.isin(keys)]
+            df = table_rows(df, name, ids, dropna=False)
+            empty = df[list(columns)].isna().all(axis=1)
+            if empty.any():
+                table = data_tables[name]
+                conn.execute(table.delete().where(table.c.state_id == bindparam("sid"),
+                                                  table.c.year == bindparam("yr")),
+                             [{"sid": int(s), "yr": int(y)}
+                              for s, y in zip(df.loc[empty, "state_id"], df.loc[empty, "year"])])
+            if not empty.all():
+                _upsert(conn, name, df[~empty])
+
+
+if __name__ == "__main__":
+    load_panel()
+    print("Reloaded " + ", ".join(TABLES))
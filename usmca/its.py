@@ -0,0 +1,142 @@
+"""Interrupted time series (ITS) regressions for every state and metric at once.
+
+Each state x metric series is fit with the same model the notebooks use,
+
+    metric ~ post + time
+
+where ``post`` is 1 from the intervention year onwards and ``time`` is the
+year relative to the intervention. Instead of parsing a formula and calling
+``smf.ols`` once per state, the normal equations for every series are built
+and solved together as stacked NumPy arrays.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+USMCA_YEAR = 2020
+NAFTA_YEAR = 1994
+
+# Metrics the report runs the ITS regression on. The notebook also fit
+# population, which it fetched from the Census API; no population file is
+# kept under data/, so the panel has no such column.
+DEFAULT_METRICS = [
+    "real_gdp",
+    "nominal_gdp",
+    "cpi_proxy",
+    "imports",
+    "exports",
+    "trade_balance",
+    "percent_born_mexico",
+    "number_of_startups",
+]
+
+TERMS = ["intercept", "post", "time"]
+
+
+def to_arrays(panel, metrics, state_col="state_name", year_col="year"):
+    """Pivot a long state x year panel into a (state, year, metric) array.
+
+    Missing state/year combinations are filled with NaN. Returns the state
+    labels, the sorted years and the value array.
+    """
+    if panel.duplicated([state_col, year_col]).any():
+        raise ValueError(f"panel has duplicate ({state_col}, {year_col}) rows")
+
+    state_codes, states = pd.factorize(panel[state_col], sort=True)
+    year_codes, years = pd.factorize(panel[year_col], sort=True)
+
+    values = np.full((len(states), len(years), len(metrics)), np.nan)
+    values[state_codes, year_codes] = panel[metrics].to_numpy(dtype=float)
+    return np.asarray(states), np.asarray(years, dtype=float), values
+
+
+def design(years, intervention_year):
+    """The (year, term) design matrix of intercept, post and time."""
+    time = years - intervention_year
+    post = (years >= intervention_year).astype(float)
+    return np.column_stack([np.ones_like(time), post, time])
+
+
+def fit_design(X, values, min_obs=10):
+    """Least squares fit of every (state, metric) series in ``values`` on ``X``.
+
+    ``X`` is a (year, term) design matrix and ``values`` has shape
+    (state, year, metric) with NaN marking missing observations. Returns a
+    dict with ``n_obs`` shaped (state, metric), ``coef``, ``se`` and
+    ``p_value`` with a trailing axis over the terms, and the ``fitted``
+    values shaped like ``values``. Series with fewer than ``min_obs``
+    observations are left as NaN.
+    """
+    mask = ~np.isnan(values)  # (state, year, metric)
+    y = np.where(mask, values, 0.0)
+    w = mask.astype(float)
+    n_obs = mask.sum(axis=1)
+
+    # X'X and X'y for every series, using only its observed years
+    xtx = np.einsum("syk,yi,yj->skij", w, X, X)
+    xty = np.einsum("syk,yi->ski", y, X)
+
+    # pinv matches statsmodels' handling of rank-deficient designs
+    xtx_inv = np.linalg.pinv(xtx)
+    coef = np.einsum("skij,skj->ski", xtx_inv, xty)
+
+    fitted = np.einsum("yi,ski->syk", X, coef)
+    sse = (w * (y - fitted) ** 2).sum(axis=1)
+    dof = n_obs - X.shape[1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma2 = sse / dof
+        se = np.sqrt(sigma2[..., None] * np.diagonal(xtx_inv, axis1=-2, axis2=-1))
+        t_stat = coef / se
+    p_value = 2 * stats.t.sf(np.abs(t_stat), dof[..., None])
+
+    too_few = (n_obs < min_obs) | (dof <= 0)
+    for arr in (coef, se, p_value):
+        arr[too_few] = np.nan
+
+    return {"n_obs": n_obs, "coef": coef, "se": se, "p_value": p_value, "fitted": fitted}
+
+
+def fit_arrays(years, values, intervention_year, min_obs=10):
+    """Fit ``y ~ post + time`` for every (state, metric) series in ``values``.
+
+    ``values`` has shape (state, year, metric) with NaN marking missing
+    observations. See ``fit_design`` for the returned arrays; their term
+    axis follows TERMS.
+    """
+    return fit_design(design(years, intervention_year), values, min_obs)
+
+
+def fit_its(panel, intervention_year, metrics=None, state_col="state_name",
+            year_col="year", min_obs=10):
+    """Run the ITS regression for every state x metric in a long panel.
+
+    ``panel`` is a long DataFrame such as ``trade_impact_df`` with one row per
+    state and year. Returns one row per state and metric with the
+    coefficient, standard error and p-value of each term, e.g.
+    ``coef_post`` and ``p_value_post``. Series with fewer than ``min_obs``
+    non-missing years are dropped, as in the notebook loops.
+    """
+    metrics = list(DEFAULT_METRICS if metrics is None else metrics)
+    states, years, values = to_arrays(panel, metrics, state_col, year_col)
+    fit = fit_arrays(years, values, intervention_year, min_obs)
+
+    results = pd.DataFrame({
+        "state": np.repeat(states, len(metrics)),
+        "metric": np.tile(metrics, len(states)),
+        "intervention_year": intervention_year,
+        "n_obs": fit["n_obs"].ravel(),
+    })
+    for i, term in enumerate(TERMS):
+        results[f"coef_{term}"] = fit["coef"][..., i].ravel()
+        results[f"se_{term}"] = fit["se"][..., i].ravel()
+        results[f"p_value_{term}"] = fit["p_value"][..., i].ravel()
+
+    results = results[results["n_obs"] >= min_obs]
+    return results.reset_index(drop=True)
+
+
+def significant(results, alpha=0.05, term="post"):
+    """Rows of ``fit_its`` output whose ``term`` p-value is below ``alpha``."""
+    return results[results[f"p_value_{term}"] < alpha]
@@ -0,0 +1,177 @@
+"""Parallel, cached loaders for the per-file data families under ``data/``.
+
+The 35 yearly job growth workbooks and the ~50 per-state business formation
+CSVs are each small, so most of their cost is parser start-up. Files are
+parsed concurrently in a process pool and every parsed file is cached under
+``data/.cache`` keyed on a hash of its name and contents. A rerun only parses
+files that are new or have changed, so adding a year of data costs one parse.
+"""
+
+import glob
+import hashlib
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from usmca.sources import DATA_DIR, finish_long
+
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+
+# Business formation folders and the number of quarters each one spans
+FORMATION_FOLDERS = {
+    "Spliced_Business_Formations_within_Eight_Quarters": 8,
+    "Spliced_Business_Formations_within_Four Quarters": 4,
+}
+
+JOB_GROWTH_FILE = re.compile(r"job_growth_(\d{4})\.xls$")
+FORMATIONS_FILE = re.compile(r"(.+)_business_formations\.csv$")
+FORMATIONS_COLUMN = re.compile(r"Average_Spliced_Business_Formations_(\d+)$")
+
+
+def file_hash(path):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(path):
+    """Cache key for a parsed file.
+
+    Parsers read the year or state from the file name, so the name is part of
+    the key along with the contents.
+    """
+    return hashlib.sha256(f"{os.path.basename(path)}:{file_hash(path)}".encode()).hexdigest()
+
+
+def parse_job_growth(path):
+    """Parse one ``job_growth_<year>.xls`` workbook."""
+    match = JOB_GROWTH_FILE.search(os.path.basename(path))
+    if match is None:
+        raise ValueError(f"{path}: expected a file named job_growth_<year>.xls")
+
+    df = pd.read_excel(path, engine="xlrd")
+    df.columns = df.columns.str.strip()
+    missing = {"State", "% Change"} - set(df.columns)
+    if missing:
+        raise ValueError(f"{path}: missing columns {sorted(missing)}")
+
+    change = pd.to_numeric(df["% Change"], errors="coerce")
+    if change.isna().any():
+        raise ValueError(f"{path}: non-numeric values in '% Change'")
+
+    return pd.DataFrame({
+        "state_name": df["State"].astype(str),
+        "year": int(match.group(1)),
+        "job_growth_percent_change": change,
+    })
+
+
+def parse_business_formations(path):
+    """Parse one ``<state>_business_formations.csv`` file.
+
+    Returns the raw formation counts along with the number of quarters the
+    counts span, read from the column name.
+    """
+    match = FORMATIONS_FILE.search(os.path.basename(path))
+    if match is None:
+        raise ValueError(f"{path}: expected a file named <state>_business_formations.csv")
+
+    df = pd.read_csv(path)
+    df.columns = df.columns.str.strip()
+    value_cols = [c for c in df.columns if FORMATIONS_COLUMN.match(c)]
+    if "observation_date" not in df.columns or len(value_cols) != 1:
+        raise ValueError(f"{path}: expected observation_date and one "
+                         f"Average_Spliced_Business_Formations_<quarters> column")
+
+    formations = pd.to_numeric(df[value_cols[0]], errors="coerce")
+    if formations.isna().any():
+        raise ValueError(f"{path}: non-numeric values in {value_cols[0]}")
+
+    return pd.DataFrame({
+        "state_name": match.group(1),
+        "year": pd.to_datetime(df["observation_date"], format="%m/%d/%Y").dt.year,
+        "formations": formations,
+        "quarters": int(FORMATIONS_COLUMN.match(value_cols[0]).group(1)),
+    })
+
+
+def load_files(paths, parse, cache_dir=CACHE_DIR, max_workers=None):
+    """Parse ``paths`` with ``parse`` and return one frame per path.
+
+    Files whose contents are already in the cache are read from it; the rest
+    are parsed in a process pool and added to the cache.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    prefix = parse.__name__.replace("parse_", "")
+    cache_paths = [os.path.join(cache_dir, f"{prefix}-{cache_key(p)}.arrow") for p in paths]
+
+    frames = {}
+    todo = []
+    for path, cache_path in zip(paths, cache_paths):
+        if os.path.exists(cache_path):
+            frames[path] = feather.read_feather(cache_path)
+        else:
+            todo.append((path, cache_path))
+
+    # A pool only pays for itself when there is more than one file to parse
+    if len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            parsed = list(pool.map(parse, [path for path, _ in todo]))
+    else:
+        parsed = [parse(path) for path, _ in todo]
+
+    for (path, cache_path), df in zip(todo, parsed):
+        # Write to a private temp file then rename, so an interrupted write or
+        # a concurrent run never leaves a partial cache entry
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            feather.write_feather(df, tmp_path, compression="uncompressed")
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        frames[path] = df
+
+    return [frames[p] for p in paths]
+
+
+def load_job_growth(data_dir=DATA_DIR, **kwargs):
+    """Annual percent change in jobs from the yearly ASU Seidman workbooks.
+
+    Parsed files are cached in ``data_dir/.cache`` unless ``cache_dir`` says
+    otherwise.
+    """
+    kwargs.setdefault("cache_dir", os.path.join(data_dir, ".cache"))
+    paths = sorted(glob.glob(os.path.join(data_dir, "Job_Growth_Data", "job_growth_*.xls")))
+    return finish_long(pd.concat(load_files(paths, parse_job_growth, **kwargs), ignore_index=True))
+
+
+def load_business_startups(data_dir=DATA_DIR, **kwargs):
+    """Spliced business formations per quarter, as ``number_of_startups``.
+
+    Parsed files are cached in ``data_dir/.cache`` unless ``cache_dir`` says
+    otherwise.
+    """
+    kwargs.setdefault("cache_dir", os.path.join(data_dir, ".cache"))
+    paths = []
+    for folder, quarters in FORMATION_FOLDERS.items():
+        for path in sorted(glob.glob(os.path.join(data_dir, folder, "*_business_formations.csv"))):
+            paths.append((path, quarters))
+
+    frames = load_files([path for path, _ in paths], parse_business_formations, **kwargs)
+    for (path, quarters), df in zip(paths, frames):
+        if (df["quarters"] != quarters).any():
+            raise ValueError(f"{path}: counts span {df['quarters'].iloc[0]} quarters, "
+                             f"but the folder holds {quarters}-quarter files")
+
+    df = pd.concat(frames, ignore_index=True)
+    df["number_of_startups"] = df["formations"] / df["quarters"]
+    return finish_long(df[["state_name", "year", "number_of_startups"]])
@@ -0,0 +1,192 @@
+"""Canonical state x year panel stored as one memory-mapped Arrow file.
+
+The build step reads every source under ``data/``, computes the derived
+metrics and writes ``data/panel.arrow``. The panel is dense: one row for
+every state and every year, sorted by state then year, so the row of any
+(state, year) pair is known without scanning. ``state_name`` is dictionary
+encoded, with the dictionary index being ``state_id - 1``.
+
+Rebuild the panel after changing anything under ``data/``::
+
+    python -m usmca.panel
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from usmca import loaders, sources, trade
+from usmca.states import STATE_NAMES
+
+PANEL_PATH = os.path.join(sources.DATA_DIR, "panel.arrow")
+
+# Metric columns in the order they are stored
+METRICS = [
+    "real_gdp",
+    "nominal_gdp",
+    "inflation_rate",
+    "per_capita_personal_income",
+    "per_capita_personal_consumption",
+    "cpi_proxy",
+    "imports",
+    "exports",
+    "trade_balance",
+    "percent_born_mexico",
+    "number_of_startups",
+    "job_growth_percent_change",
+]
+
+# Each source, the reader that turns it into a long frame, and the files it
+# reads (glob patterns relative to data/)
+READERS = {
+    "gdp": sources.read_gdp,
+    "personal_income": sources.read_personal_income,
+    "trade": trade.read_trade,
+    "migration": sources.read_migration,
+    "business_startups": loaders.load_business_startups,
+    "job_growth": loaders.load_job_growth,
+}
+
+SOURCE_FILES = {
+    "gdp": ["Real_GDP_by_State.csv", "Nominal_GDP_by_State.csv"],
+    "personal_income": ["per_capita_personal_income.csv", "per_capita_personal_consumption.csv"],
+    "trade": trade.TRADE_FILES,
+    "migration": ["percent_foreign_born_mexico_by_state_interpolated.csv"],
+    "business_startups": [os.path.join(folder, "*_business_formations.csv")
+                          for folder in loaders.FORMATION_FOLDERS],
+    "job_growth": [os.path.join("Job_Growth_Data", "job_growth_*.xls")],
+}
+
+
+def inflation_rate(panel):
+    """Year-over-year percent change in the GDP deflator, per state."""
+    deflator = panel["nominal_gdp"] / panel["real_gdp"] * 100
+    inflation = deflator.groupby(panel["state_name"], observed=True).pct_change() * 100
+    # The first year with GDP data has no prior year, the notebook sets it to 0
+    inflation[deflator.notna() & inflation.isna()] = 0
+    return inflation
+
+
+def cpi_proxy(panel):
+    """Per-capita consumption as a percent of per-capita income."""
+    return panel["per_capita_personal_consumption"] / panel["per_capita_personal_income"] * 100
+
+
+def trade_balance(panel):
+    """Exports to minus imports from Mexico."""
+    return panel["exports"] - panel["imports"]
+
+
+# Derived metrics, the columns each one is computed from, and how
+DERIVED = {
+    "inflation_rate": (["nominal_gdp", "real_gdp"], inflation_rate),
+    "cpi_proxy": (["per_capita_personal_income", "per_capita_personal_consumption"], cpi_proxy),
+    "trade_balance": (["exports", "imports"], trade_balance),
+}
+
+
+def add_derived(panel):
+    """Compute every derived metric in place."""
+    for column, (_, compute) in DERIVED.items():
+        panel[column] = compute(panel)
+    return panel
+
+
+def build_panel(data_dir=sources.DATA_DIR):
+    """Read every source and join them into the dense state x year panel."""
+    frames = [reader(data_dir) for reader in READERS.values()]
+    panel = join_frames(empty_panel(*year_range(frames)), frames)
+    panel = add_derived(panel)
+    return panel[["state_name", "year"] + METRICS]
+
+
+def year_range(frames):
+    """First and last year covered by any of the long ``frames``."""
+    return (min(f["year"].min() for f in frames), max(f["year"].max() for f in frames))
+
+
+def empty_panel(first_year, last_year, states=STATE_NAMES):
+    """A dense panel of every state and year with all metrics missing."""
+    index = pd.MultiIndex.from_product(
+        [states, range(first_year, last_year + 1)], names=["state_name", "year"])
+    panel = pd.DataFrame(np.nan, index=index, columns=METRICS).reset_index()
+    panel["state_name"] = pd.Categorical(panel["state_name"], categories=states)
+    return panel
+
+
+def join_frames(panel, frames):
+    """Overwrite the panel columns each long frame provides with its values.
+
+    Cells a frame has no row for become missing, so a frame always replaces
+    its columns as a whole.
+    """
+    keys = pd.MultiIndex.from_arrays(
+        [panel["state_name"].astype(str), panel["year"]], names=["state_name", "year"])
+    for frame in frames:
+        frame = frame.set_index(["state_name", "year"])
+        panel[list(frame.columns)] = frame.reindex(keys).to_numpy()
+    return panel
+
+
+def write_panel(panel, path=PANEL_PATH):
+    """Write a panel from ``build_panel`` as an uncompressed Arrow IPC file."""
+    years = panel["year"].to_numpy()
+    codes = panel["state_name"].cat.codes.to_numpy()
+    n_years = years.max() - years.min() + 1
+    expected = np.arange(len(panel))
+    if len(panel) != len(STATE_NAMES) * n_years or not np.array_equal(
+            codes * n_years + (years - years.min()), expected):
+        raise ValueError("panel must be dense and sorted by state then year")
+
+    state_name = pa.DictionaryArray.from_arrays(
+        pa.array(codes, type=pa.int8()), pa.array(STATE_NAMES))
+    columns = {"state_name": state_name, "year": pa.array(years, type=pa.int16())}
+    for metric in METRICS:
+        columns[metric] = pa.array(panel[metric].to_numpy(dtype=float), from_pandas=True)
+
+    table = pa.table(columns).replace_schema_metadata({
+        "first_year": str(years.min()),
+        "last_year": str(years.max()),
+    })
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def read_panel(columns=None, years=None, states=None, path=PANEL_PATH):
+    """Load part of the panel from the memory-mapped Arrow file.
+
+    ``columns`` limits which metrics are read, ``years`` is an inclusive
+    ``(first, last)`` range and ``states`` a list of state names. Only the
+    requested rows and columns are copied out of the file.
+    """
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+        metadata = table.schema.metadata
+        first_year = int(metadata[b"first_year"])
+        last_year = int(metadata[b"last_year"])
+
+        if columns is not None:
+            table = table.select(["state_name", "year"] + list(columns))
+
+        if years is not None or states is not None:
+            lo, hi = years if years is not None else (first_year, last_year)
+            year_offsets = np.arange(max(lo, first_year), min(hi, last_year) + 1) - first_year
+            state_names = STATE_NAMES if states is None else list(states)
+            state_codes = np.array([STATE_NAMES.index(s) for s in state_names])
+            n_years = last_year - first_year + 1
+            rows = (state_codes[:, None] * n_years + year_offsets[None, :]).ravel()
+            table = table.take(pa.array(rows, type=pa.int64()))
+
+        return table.to_pandas()
+
+
+if __name__ == "__main__":
+    panel = build_panel()
+    write_panel(panel)
+    print(f"Wrote {len(panel)} rows x {len(METRICS)} metrics to {PANEL_PATH} "
+          f"({os.path.getsize(PANEL_PATH) / 1024:.0f} KB)")
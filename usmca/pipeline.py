@@ -0,0 +1,155 @@
+"""Incremental rebuild of the panel and results when source files change.
+
+The pipeline is a small dependency graph::
+
+    source files -> base columns -> derived columns -> ITS / t-test results
+
+A manifest in ``data/.cache`` records the content hash of every source file
+from the last run. On the next run only the sources whose files changed are
+re-read; the cells of the panel that actually moved are found by diffing,
+derived columns are recomputed only for the states whose inputs moved, and
+only the state x metric tests that read a changed cell are refit. The
+updated panel and results are written back in place::
+
+    python -m usmca.pipeline
+"""
+
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from usmca import loaders
+from usmca.panel import (DERIVED, METRICS, READERS, SOURCE_FILES, build_panel,
+                         empty_panel, join_frames, read_panel, write_panel,
+                         year_range)
+from usmca.results import (TESTS, build_results, read_results,
+                           run_test, sort_results, write_results)
+from usmca.sources import DATA_DIR
+
+MANIFEST_NAME = "pipeline.json"
+
+
+def source_hashes(data_dir=DATA_DIR):
+    """Content hash of every file each source reads, keyed by relative path."""
+    hashes = {}
+    for name, patterns in SOURCE_FILES.items():
+        files = sorted(p for pattern in patterns
+                       for p in glob.glob(os.path.join(data_dir, pattern)))
+        hashes[name] = {os.path.relpath(p, data_dir): loaders.file_hash(p) for p in files}
+    return hashes
+
+
+def changed_cells(old, new, columns):
+    """Boolean frame marking the cells of ``columns`` that differ.
+
+    Both panels must have the same rows. Missing on both sides counts as
+    unchanged.
+    """
+    old_values = old[columns].to_numpy(dtype=float)
+    new_values = new[columns].to_numpy(dtype=float)
+    same = (old_values == new_values) | (np.isnan(old_values) & np.isnan(new_values))
+    return pd.DataFrame(~same, columns=columns, index=new.index)
+
+
+def update_panel(old, frames):
+    """Apply re-read source frames to the panel and recompute what depends on them.
+
+    Returns the new panel and a frame marking every metric cell that changed.
+    The panel grows to cover any new years in ``frames``.
+    """
+    first_year, last_year = year_range([old] + frames)
+    base = empty_panel(first_year, last_year)
+    # Carry the old values over onto the (possibly larger) grid
+    keep = old.set_index([old["state_name"].astype(str), "year"])[METRICS]
+    keys = pd.MultiIndex.from_arrays([base["state_name"].astype(str), base["year"]])
+    base[METRICS] = keep.reindex(keys).to_numpy()
+
+    new = join_frames(base.copy(), frames)
+    changed = changed_cells(base, new, METRICS)
+
+    for column, (inputs, compute) in DERIVED.items():
+        states = new.loc[changed[inputs].any(axis=1), "state_name"].unique()
+        if len(states):
+            rows = new["state_name"].isin(states)
+            new.loc[rows, column] = compute(new[rows])
+
+    return new, changed_cells(base, new, METRICS)
+
+
+def update_results(results, panel, changed):
+    """Refit only the tests whose input series have a changed cell.
+
+    Returns the updated results and the number of state x metric tests refit.
+    """
+    refit = []
+    for method, metrics, intervention, years in TESTS:
+        window = np.ones(len(panel), dtype=bool) if years is None else panel["year"].between(*years)
+        for metric in metrics:
+            states = panel.loc[window & changed[metric], "state_name"].astype(str).unique()
+            if not len(states):
+                continue
+            subset = panel[panel["state_name"].isin(states)]
+            stale = ((results["metric"] == metric) & (results["intervention"] == intervention)
+                     & (results["method"] == method) & results["state"].isin(states))
+            results = results[~stale]
+            refit.append(run_test(subset, method, [metric], intervention, years))
+
+    n_refit = sum(len(df) for df in refit)
+    if refit:
+        results = pd.concat([results] + refit, ignore_index=True)
+    return sort_results(results), n_refit
+
+
+def run(data_dir=DATA_DIR, force=False):
+    """Bring ``panel.arrow`` and ``results.csv`` in ``data_dir`` up to date.
+
+    Returns a summary dict with the sources that were re-read, the changed
+    panel cells (one row per state, year and metric) and the number of tests
+    refit. ``force`` rebuilds everything from scratch.
+    """
+    panel_path = os.path.join(data_dir, "panel.arrow")
+    results_path = os.path.join(data_dir, "results.csv")
+    manifest_path = os.path.join(data_dir, ".cache", MANIFEST_NAME)
+
+    hashes = source_hashes(data_dir)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    full = force or not (os.path.exists(panel_path) and os.path.exists(results_path))
+    sources = list(READERS) if full else [n for n in READERS if hashes[n] != manifest.get(n)]
+
+    if full:
+        panel = build_panel(data_dir)
+        results = build_results(panel)
+        changed = pd.DataFrame(True, columns=METRICS, index=panel.index)
+        n_refit = len(results)
+    elif sources:
+        old = read_panel(path=panel_path)
+        panel, changed = update_panel(old, [READERS[n](data_dir) for n in sources])
+        results, n_refit = update_results(read_results(results_path), panel, changed)
+    else:
+        panel, changed, n_refit = None, None, 0
+
+    if sources:
+        write_panel(panel, panel_path)
+        write_results(results, results_path)
+        os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+        with open(manifest_path, "w") as f:
+            json.dump(hashes, f, indent=1)
+
+    cells = pd.DataFrame(columns=["state_name", "year", "metric"])
+    if changed is not None:
+        stacked = changed.set_axis(pd.MultiIndex.from_frame(panel[["state_name", "year"]])).stack()
+        cells = stacked[stacked].index.to_frame(index=False, name=["state_name", "year", "metric"])
+    return {"sources": sources, "changed": cells, "refit": n_refit}
+
+
+if __name__ == "__main__":
+    summary = run()
+    print(f"Re-read sources: {', '.join(summary['sources']) or 'none'}")
+    print(f"Changed cells: {len(summary['changed'])}, tests refit: {summary['refit']}")
@@ -0,0 +1,98 @@
+"""Precomputed ITS and t-test results behind every finding in the report.
+
+``build_results`` reruns each test the report relies on and collects them in
+one compact table with a row per state, metric and intervention::
+
+    state, region, fips, metric, intervention, method, coefficient, p_value
+
+For ITS rows ``coefficient`` is the level change at the intervention
+(``coef_post``); for t-test rows it is the post minus pre mean. The table is
+written to ``data/results.csv`` so the app never refits anything::
+
+    python -m usmca.results
+"""
+
+import os
+
+import pandas as pd
+
+from usmca.its import NAFTA_YEAR, USMCA_YEAR, fit_its
+from usmca.panel import read_panel
+from usmca.sources import DATA_DIR
+from usmca.states import REGIONS, STATE_FIPS
+from usmca.ttest import fit_ttest
+
+RESULTS_PATH = os.path.join(DATA_DIR, "results.csv")
+
+INTERVENTIONS = {"NAFTA": NAFTA_YEAR, "USMCA": USMCA_YEAR}
+
+# Display names for the metrics in the report
+METRIC_LABELS = {
+    "real_gdp": "Real GDP",
+    "inflation_rate": "Inflation Rate",
+    "cpi_proxy": "CPI Proxy",
+    "percent_born_mexico": "Net Migration from Mexico",
+    "imports": "Imports from Mexico",
+    "exports": "Exports to Mexico",
+    "trade_balance": "Trade Balance with Mexico",
+    "number_of_startups": "Business Startups",
+    "job_growth_percent_change": "Job Growth",
+}
+
+# (method, metrics, intervention, years) for every test in the report. The
+# USMCA analysis uses the 2010-2023 window of the merged panel, job growth
+# uses every year of the ASU Seidman data.
+TESTS = [
+    ("its", ["real_gdp", "inflation_rate", "cpi_proxy", "imports", "exports",
+             "trade_balance", "number_of_startups"], "USMCA", (2010, 2023)),
+    ("ttest", ["percent_born_mexico"], "USMCA", (2010, 2023)),
+    ("its", ["job_growth_percent_change"], "USMCA", None),
+    ("its", ["job_growth_percent_change"], "NAFTA", None),
+]
+
+
+def run_test(panel, method, metrics, intervention, years):
+    """Run one entry of ``TESTS`` on ``panel`` and return its result rows."""
+    data = panel if years is None else panel[panel["year"].between(*years)]
+    year = INTERVENTIONS[intervention]
+    if method == "its":
+        df = fit_its(data, year, metrics).rename(columns={"coef_post": "coefficient",
+                                                          "p_value_post": "p_value"})
+    else:
+        df = fit_ttest(data, year, metrics).rename(columns={"diff": "coefficient"})
+    df["intervention"] = intervention
+    df["method"] = method
+    df["state"] = df["state"].astype(str)
+    df.insert(1, "region", df["state"].map(REGIONS))
+    df.insert(2, "fips", df["state"].map(STATE_FIPS))
+    return df[["state", "region", "fips", "metric", "intervention", "method",
+               "coefficient", "p_value"]]
+
+
+def sort_results(results):
+    """Put result rows in a stable order so rebuilt tables diff cleanly."""
+    return results.sort_values(["intervention", "method", "metric", "state"]).reset_index(drop=True)
+
+
+def build_results(panel=None):
+    """Run every test in ``TESTS`` and return the combined results table."""
+    if panel is None:
+        panel = read_panel()
+    frames = [run_test(panel, *test) for test in TESTS]
+    return sort_results(pd.concat(frames, ignore_index=True))
+
+
+def write_results(results, path=RESULTS_PATH):
+    """Write the results table, rounded so reruns only differ where values do."""
+    results.to_csv(path, index=False, float_format="%.10g")
+
+
+def read_results(path=RESULTS_PATH):
+    """Load the results table written by ``python -m usmca.results``."""
+    return pd.read_csv(path)
+
+
+if __name__ == "__main__":
+    results = build_results()
+    write_results(results)
+    print(f"Wrote {len(results)} results to {RESULTS_PATH}")
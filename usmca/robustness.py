@@ -0,0 +1,302 @@
+"""Resampling checks on the state-level ITS effects.
+
+The report's significance labels rest on OLS p-values from a handful of
+post-2020 years per state. This module re-tests every state x metric three
+ways:
+
+- ``placebo``: refit the ITS on pre-intervention years only, once per fake
+  intervention year, and rank the real post coefficient's t statistic
+  among the placebo ones of every state (placebo in time, pooled across
+  space). A metric with fewer than ``1 / alpha`` placebo fits cannot reach
+  significance, so its placebo rows are left out.
+- ``bootstrap``: moving-block bootstrap of the ITS residuals. Percentile
+  confidence intervals come from resampling around the full model. The
+  p-value comes from resampling around the null model without a post term.
+- ``synthetic``: synthetic control. Each state is matched on its
+  pre-intervention path by a convex combination of the other 49 states,
+  on series indexed to their pre-period mean, or demeaned for metrics such
+  as trade balance that are not always positive. The estimate is the mean
+  post-intervention gap. The p-value ranks the state's post/pre RMSPE
+  ratio among every state's ratio (placebo in space).
+
+Every bootstrap replicate refits all states and metrics at once with
+``its.fit_design``. Replicates and synthetic control fits run in a process
+pool. The panel arrays live in shared memory, so workers attach to them by
+name instead of receiving pickled DataFrames::
+
+    python -m usmca.robustness
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import nnls
+
+from usmca.its import design, fit_design, to_arrays
+from usmca.panel import read_panel
+from usmca.results import INTERVENTIONS, TESTS, write_results
+from usmca.sources import DATA_DIR
+
+ROBUSTNESS_PATH = os.path.join(DATA_DIR, "robustness.csv")
+
+N_BOOT = 2000
+BLOCK_LENGTH = 3
+CHUNK_SIZE = 100
+MIN_OBS = 10
+
+# Arrays attached in each worker process, by name
+_shared = {}
+
+
+def _share(arrays):
+    """Copy ``arrays`` into shared memory blocks.
+
+    Returns the blocks (to close and unlink later) and the specs workers
+    need to attach to them.
+    """
+    blocks, specs = [], {}
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr, dtype=float)
+        block = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=float, buffer=block.buf)[...] = arr
+        blocks.append(block)
+        specs[name] = (block.name, arr.shape)
+    return blocks, specs
+
+
+def _attach(specs):
+    # Pool initializer: map every shared array into this worker
+    for name, (block_name, shape) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _shared[name] = (block, np.ndarray(shape, dtype=float, buffer=block.buf))
+
+
+def _array(name):
+    return _shared[name][1]
+
+
+def block_resample(resid, rng, block_length=BLOCK_LENGTH):
+    """Moving-block resample of (state, year, metric) residuals along years.
+
+    Every series gets its own block starts. Missing residuals are treated
+    as zero.
+    """
+    n_states, n_years, n_metrics = resid.shape
+    resid = np.nan_to_num(resid)
+    n_blocks = -(-n_years // block_length)
+    starts = rng.integers(0, n_years - block_length + 1, size=(n_states, n_metrics, n_blocks))
+    idx = (starts[..., None] + np.arange(block_length)).reshape(n_states, n_metrics, -1)
+    idx = idx[..., :n_years].transpose(0, 2, 1)  # (state, year, metric)
+    return np.take_along_axis(resid, idx, axis=1)
+
+
+def _bootstrap_chunk(n_reps, seed, intervention_year, block_length, min_obs):
+    """Run ``n_reps`` bootstrap replicates on the shared arrays.
+
+    Returns the post coefficients resampled around the full model and the
+    post t statistics resampled around the null model, each shaped
+    (replicate, state, metric).
+    """
+    years, values = _array("years"), _array("values")
+    fitted, resid = _array("fitted"), _array("resid")
+    null_fitted, null_resid = _array("null_fitted"), _array("null_resid")
+    X = design(years, intervention_year)
+    mask = np.isnan(values)
+    rng = np.random.default_rng(seed)
+
+    coefs, t_null = [], []
+    for _ in range(n_reps):
+        y = fitted + block_resample(resid, rng, block_length)
+        y[mask] = np.nan
+        coefs.append(fit_design(X, y, min_obs)["coef"][..., 1])
+
+        y0 = null_fitted + block_resample(null_resid, rng, block_length)
+        y0[mask] = np.nan
+        fit = fit_design(X, y0, min_obs)
+        t_null.append(fit["coef"][..., 1] / fit["se"][..., 1])
+    return np.stack(coefs), np.stack(t_null)
+
+
+def synthetic_weights(treated, donors, penalty=100.0):
+    """Non-negative donor weights summing to one that best match ``treated``.
+
+    ``treated`` is a (year,) pre-period path and ``donors`` is (year, donor).
+    The sum-to-one constraint is added as a heavily weighted extra row.
+    """
+    A = np.vstack([donors, penalty * np.ones(donors.shape[1])])
+    b = np.append(treated, penalty)
+    weights, _ = nnls(A, b)
+    return weights / weights.sum()
+
+
+def _synthetic_metric(metric, intervention_year):
+    """Synthetic control for every state on one metric of the shared values.
+
+    Metrics that are positive throughout are indexed to each state's
+    pre-period mean so states of any size can be combined. Metrics that
+    touch zero or change sign, where that mean can be ~0 or negative, are
+    demeaned instead. Returns per-state arrays of the mean post gap (in the
+    metric's units) and the post/pre RMSPE ratio. States without a complete
+    series get NaN and are not used as donors.
+    """
+    years, values = _array("years"), _array("values")[:, :, metric]
+    pre = years < intervention_year
+    complete = ~np.isnan(values).any(axis=1)
+    n_states = values.shape[0]
+
+    effect = np.full(n_states, np.nan)
+    ratio = np.full(n_states, np.nan)
+    if complete.sum() < 3 or pre.sum() < 2 or (~pre).sum() < 1:
+        return effect, ratio
+
+    level = values[:, pre].mean(axis=1)
+    if (values[complete] > 0).all():
+        scale = level
+        matched = values / scale[:, None]
+    else:
+        scale = np.ones(n_states)
+        matched = values - level[:, None]
+
+    for s in np.flatnonzero(complete):
+        donors = np.flatnonzero(complete & (np.arange(n_states) != s))
+        weights = synthetic_weights(matched[s, pre], matched[donors][:, pre].T)
+        gap = matched[s] - weights @ matched[donors]
+        pre_rmspe = np.sqrt(np.mean(gap[pre] ** 2))
+        post_rmspe = np.sqrt(np.mean(gap[~pre] ** 2))
+        effect[s] = gap[~pre].mean() * scale[s]
+        ratio[s] = post_rmspe / pre_rmspe if pre_rmspe > 0 else np.inf
+    return effect, ratio
+
+
+def placebo_test(years, values, intervention_year, min_side=3, alpha=0.05):
+    """Placebo-in-time p-values for the post coefficient of every series.
+
+    Placebo interventions are placed in every pre-intervention year that
+    leaves at least ``min_side`` years on both sides, and are fit on the
+    pre-intervention years only. Each series' real t statistic is ranked
+    among the placebo t statistics of every state for the same metric. A
+    handful of placebo years per state could never give a p-value below
+    ``alpha``. Metrics with fewer than ``1 / alpha`` placebos get NaN.
+    """
+    real = fit_design(design(years, intervention_year), values, MIN_OBS)
+    t_real = np.abs(real["coef"][..., 1] / real["se"][..., 1])
+    p_value = np.full(t_real.shape, np.nan)
+
+    pre = years < intervention_year
+    pre_years, pre_values = years[pre], values[:, pre]
+    placebo_t = []
+    for year in pre_years[min_side:len(pre_years) - min_side + 1]:
+        fit = fit_design(design(pre_years, year), pre_values, 2 * min_side)
+        placebo_t.append(np.abs(fit["coef"][..., 1] / fit["se"][..., 1]))
+    if not placebo_t:
+        return real["coef"][..., 1], p_value
+
+    # (placebo year x state, metric) pool of placebo statistics
+    pool = np.stack(placebo_t).reshape(-1, values.shape[2])
+    for m in range(values.shape[2]):
+        stats = np.sort(pool[:, m][~np.isnan(pool[:, m])])
+        if len(stats) < 1 / alpha:
+            continue
+        exceed = len(stats) - np.searchsorted(stats, t_real[:, m], side="left")
+        p_value[:, m] = (1 + exceed) / (1 + len(stats))
+    p_value[np.isnan(t_real)] = np.nan
+    return real["coef"][..., 1], p_value
+
+
+def run_robustness(panel, intervention_year, metrics, n_boot=N_BOOT,
+                   block_length=BLOCK_LENGTH, max_workers=None, seed=0,
+                   alpha=0.05):
+    """Placebo, block bootstrap and synthetic control results for a panel.
+
+    Returns one row per state, metric and method with the effect estimate,
+    a ``1 - alpha`` confidence interval (bootstrap only) and a p-value.
+    """
+    states, years, values = to_arrays(panel, list(metrics))
+    X = design(years, intervention_year)
+    full = fit_design(X, values, MIN_OBS)
+    null = fit_design(X[:, [0, 2]], values, MIN_OBS)
+    t_obs = full["coef"][..., 1] / full["se"][..., 1]
+
+    blocks, specs = _share({
+        "years": years,
+        "values": values,
+        "fitted": full["fitted"],
+        "resid": values - full["fitted"],
+        "null_fitted": null["fitted"],
+        "null_resid": values - null["fitted"],
+    })
+    try:
+        chunks = [min(CHUNK_SIZE, n_boot - start) for start in range(0, n_boot, CHUNK_SIZE)]
+        seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach,
+                                 initargs=(specs,)) as pool:
+            boot = [pool.submit(_bootstrap_chunk, n, s, intervention_year, block_length, MIN_OBS)
+                    for n, s in zip(chunks, seeds)]
+            synth = [pool.submit(_synthetic_metric, m, intervention_year)
+                     for m in range(len(metrics))]
+            boot = [f.result() for f in boot]
+            synth = [f.result() for f in synth]
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    coefs = np.concatenate([c for c, _ in boot])
+    t_null = np.abs(np.concatenate([t for _, t in boot]))
+    with np.errstate(invalid="ignore"):
+        ci_low, ci_high = np.nanpercentile(coefs, [100 * alpha / 2, 100 * (1 - alpha / 2)], axis=0)
+        boot_p = (1 + (t_null >= np.abs(t_obs)).sum(axis=0)) / (1 + (~np.isnan(t_null)).sum(axis=0))
+    boot_p[np.isnan(t_obs)] = np.nan
+
+    placebo_coef, placebo_p = placebo_test(years, values, intervention_year, alpha=alpha)
+
+    synth_effect = np.column_stack([e for e, _ in synth])
+    synth_ratio = np.column_stack([r for _, r in synth])
+    with np.errstate(invalid="ignore"):
+        ranks = (synth_ratio[None, :, :] >= synth_ratio[:, None, :]).sum(axis=0)
+        synth_p = ranks / (~np.isnan(synth_ratio)).sum(axis=0)
+    synth_p[np.isnan(synth_ratio)] = np.nan
+
+    nan = np.full(t_obs.shape, np.nan)
+    rows = []
+    for method, estimate, low, high, p_value in [
+        ("placebo", placebo_coef, nan, nan, placebo_p),
+        ("bootstrap", full["coef"][..., 1], ci_low, ci_high, boot_p),
+        ("synthetic", synth_effect, nan, nan, synth_p),
+    ]:
+        rows.append(pd.DataFrame({
+            "state": np.repeat(states.astype(str), len(metrics)),
+            "metric": np.tile(list(metrics), len(states)),
+            "method": method,
+            "estimate": estimate.ravel(),
+            "ci_low": low.ravel(),
+            "ci_high": high.ravel(),
+            "p_value": p_value.ravel(),
+        }))
+    results = pd.concat(rows, ignore_index=True)
+    skipped = (results["method"] == "placebo") & results["p_value"].isna()
+    return results[~skipped].dropna(subset=["estimate"]).reset_index(drop=True)
+
+
+def build_robustness(panel=None, **kwargs):
+    """Run ``run_robustness`` over the metrics and windows of ``results.TESTS``."""
+    if panel is None:
+        panel = read_panel()
+
+    frames = []
+    for _, metrics, intervention, years in TESTS:
+        data = panel if years is None else panel[panel["year"].between(*years)]
+        df = run_robustness(data, INTERVENTIONS[intervention], metrics, **kwargs)
+        df.insert(2, "intervention", intervention)
+        frames.append(df)
+    results = pd.concat(frames, ignore_index=True)
+    return results.sort_values(["intervention", "method", "metric", "state"]).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    results = build_robustness()
+    write_results(results, ROBUSTNESS_PATH)
+    print(f"Wrote {len(results)} robustness results to {ROBUSTNESS_PATH}")
@@ -0,0 +1,61 @@
+"""Readers that turn each raw file under ``data/`` into a long frame.
+
+Every reader returns one row per state and year with a ``state_name`` column
+spelled as in ``usmca.states`` and an integer ``year`` column. Rows for
+anything other than the 50 states are dropped.
+"""
+
+import os
+
+import pandas as pd
+
+from usmca.states import normalize_names
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def finish_long(df):
+    """Normalize state names, drop non-state rows and make ``year`` an int."""
+    df["state_name"] = normalize_names(df["state_name"]).to_numpy()
+    df = df.dropna(subset=["state_name"])
+    df["year"] = df["year"].astype(int)
+    return df.reset_index(drop=True)
+
+
+def melt_years(df, value_name):
+    """Melt a wide file with a State column and one column per year."""
+    df = df.rename(columns=lambda c: str(c).strip())
+    year_cols = [c for c in df.columns if c.isdigit()]
+    long_df = df.melt(id_vars=["State"], value_vars=year_cols,
+                      var_name="year", value_name=value_name)
+    return long_df.rename(columns={"State": "state_name"})
+
+
+def read_gdp(data_dir=DATA_DIR):
+    """Real and nominal GDP (millions of USD) from the BEA wide files."""
+    real = melt_years(pd.read_csv(os.path.join(data_dir, "Real_GDP_by_State.csv")), "real_gdp")
+    nominal = melt_years(pd.read_csv(os.path.join(data_dir, "Nominal_GDP_by_State.csv")), "nominal_gdp")
+    return finish_long(real.merge(nominal, on=["state_name", "year"], how="outer"))
+
+
+def read_personal_income(data_dir=DATA_DIR):
+    """Real per-capita personal income and consumption."""
+    income = pd.read_csv(os.path.join(data_dir, "per_capita_personal_income.csv"))
+    consumption = pd.read_csv(os.path.join(data_dir, "per_capita_personal_consumption.csv"))
+    df = income.merge(consumption, on=["State", "Year"], how="outer")
+    df = df.rename(columns={
+        "State": "state_name",
+        "Year": "year",
+        "Per_Capita_Personal_Income": "per_capita_personal_income",
+        "Per_Capita_Personal_Consumption": "per_capita_personal_consumption",
+    })
+    return finish_long(df)
+
+
+def read_migration(data_dir=DATA_DIR):
+    """Interpolated percent of each state's population born in Mexico."""
+    path = os.path.join(data_dir, "percent_foreign_born_mexico_by_state_interpolated.csv")
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    df = df.rename(columns={"State": "state_name", "Year": "year",
+                            "Percent_Born_Mexico": "percent_born_mexico"})
+    return finish_long(df)
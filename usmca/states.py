@@ -0,0 +1,69 @@
+"""The 50 states and their regions, in the order of the ``states`` table.
+
+``state_id`` is the 1-based position in ``STATES``, which matches the SERIAL
+ids the notebook assigns when it inserts the states into the database.
+"""
+
+import pandas as pd
+
+STATES = [
+    ("Alabama", "South"), ("Hawaii", "West"), ("Alaska", "West"),
+    ("Washington", "West"), ("Oregon", "West"), ("California", "West"),
+    ("Nevada", "West"), ("Idaho", "West"), ("Montana", "West"),
+    ("Wyoming", "West"), ("Utah", "West"), ("Colorado", "West"),
+    ("Arizona", "Southwest"), ("New Mexico", "Southwest"),
+    ("Oklahoma", "Southwest"), ("Texas", "Southwest"),
+    ("North Dakota", "Midwest"), ("South Dakota", "Midwest"),
+    ("Nebraska", "Midwest"), ("Kansas", "Midwest"), ("Minnesota", "Midwest"),
+    ("Iowa", "Midwest"), ("Wisconsin", "Midwest"), ("Missouri", "Midwest"),
+    ("Illinois", "Midwest"), ("Michigan", "Midwest"), ("Indiana", "Midwest"),
+    ("Ohio", "Midwest"), ("Arkansas", "South"), ("Louisiana", "South"),
+    ("Mississippi", "South"), ("Kentucky", "South"), ("Tennessee", "South"),
+    ("Florida", "South"), ("Georgia", "South"), ("South Carolina", "South"),
+    ("North Carolina", "South"), ("Virginia", "South"),
+    ("West Virginia", "South"), ("Maryland", "Northeast"),
+    ("Delaware", "Northeast"), ("Pennsylvania", "Northeast"),
+    ("New Jersey", "Northeast"), ("New York", "Northeast"),
+    ("Connecticut", "Northeast"), ("Rhode Island", "Northeast"),
+    ("Massachusetts", "Northeast"), ("Vermont", "Northeast"),
+    ("New Hampshire", "Northeast"), ("Maine", "Northeast"),
+]
+
+# Census FIPS codes, used to join results onto map shapes
+STATE_FIPS = {
+    "Alabama": 1, "Alaska": 2, "Arizona": 4, "Arkansas": 5, "California": 6,
+    "Colorado": 8, "Connecticut": 9, "Delaware": 10, "Florida": 12,
+    "Georgia": 13, "Hawaii": 15, "Idaho": 16, "Illinois": 17, "Indiana": 18,
+    "Iowa": 19, "Kansas": 20, "Kentucky": 21, "Louisiana": 22, "Maine": 23,
+    "Maryland": 24, "Massachusetts": 25, "Michigan": 26, "Minnesota": 27,
+    "Mississippi": 28, "Missouri": 29, "Montana": 30, "Nebraska": 31,
+    "Nevada": 32, "New Hampshire": 33, "New Jersey": 34, "New Mexico": 35,
+    "New York": 36, "North Carolina": 37, "North Dakota": 38, "Ohio": 39,
+    "Oklahoma": 40, "Oregon": 41, "Pennsylvania": 42, "Rhode Island": 44,
+    "South Carolina": 45, "South Dakota": 46, "Tennessee": 47, "Texas": 48,
+    "Utah": 49, "Vermont": 50, "Virginia": 51, "Washington": 53,
+    "West Virginia": 54, "Wisconsin": 55, "Wyoming": 56,
+}
+
+STATE_NAMES = [name for name, _ in STATES]
+STATE_IDS = {name: i + 1 for i, name in enumerate(STATE_NAMES)}
+REGIONS = dict(STATES)
+
+
+def states_frame():
+    """The states table as a DataFrame with state_id, state_name and region."""
+    return pd.DataFrame({
+        "state_id": list(STATE_IDS.values()),
+        "state_name": STATE_NAMES,
+        "region": [region for _, region in STATES],
+    })
+
+
+def normalize_names(names):
+    """Title-case and strip state names so every source spells them alike.
+
+    Names that are not one of the 50 states (District of Columbia, United
+    States totals, ...) come back as NaN.
+    """
+    names = pd.Series(names).astype(str).str.strip().str.title()
+    return names.where(names.isin(STATE_IDS))
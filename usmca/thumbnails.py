@@ -0,0 +1,83 @@
+"""WebP thumbnails of the report images for the Streamlit app.
+
+Each image is encoded once per version at a few widths; the browser picks
+one from the ``srcset``. The source file's mtime is part of the file names,
+so new images get new URLs and bust the browser cache. Run
+``python -m usmca.thumbnails`` as a build step so the app never encodes on
+a reader's request.
+"""
+
+import glob
+import os
+import re
+import tempfile
+
+from PIL import Image
+
+from usmca.sources import DATA_DIR
+
+THUMBNAIL_WIDTHS = (480, 960, 1440)
+THUMBNAIL_DIR = os.path.join(os.path.dirname(DATA_DIR), "static", "thumbnails")
+IMAGE_DIR = os.path.join(os.path.dirname(DATA_DIR), "images")
+
+
+def _remove_stale(out_dir, stem, width, keep):
+    # Thumbnails of older versions of the same image at the same width
+    pattern = re.compile(rf"{re.escape(stem)}-\d+-{width}w\.webp")
+    for path in glob.glob(os.path.join(out_dir, f"{glob.escape(stem)}-*-{width}w.webp")):
+        name = os.path.basename(path)
+        if name != keep and pattern.fullmatch(name):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def make_thumbnails(image_path, out_dir=THUMBNAIL_DIR, widths=THUMBNAIL_WIDTHS):
+    """Encode the missing thumbnails of ``image_path`` into ``out_dir``.
+
+    Returns ``(file_name, width, height)`` for every distinct width, smallest
+    first. Widths are capped at the source image's width. Only the image
+    header is read unless a thumbnail has to be encoded, and encoding a new
+    version removes the thumbnails of older ones.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(image_path))[0]
+    version = int(os.path.getmtime(image_path))
+    with Image.open(image_path) as image:
+        thumbnails = []
+        for width in sorted({min(w, image.width) for w in widths}):
+            height = round(image.height * width / image.width)
+            file_name = f"{stem}-{version}-{width}w.webp"
+            thumb_path = os.path.join(out_dir, file_name)
+            if not os.path.exists(thumb_path):
+                # Encode to a private temp file and rename it into place, so a
+                # cut-off save or a concurrent app process never leaves a
+                # truncated thumbnail under the final name
+                fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        image.resize((width, height), Image.LANCZOS).save(f, "WEBP", quality=85, method=4)
+                    os.replace(tmp_path, thumb_path)
+                except BaseException:
+                    os.remove(tmp_path)
+                    raise
+                _remove_stale(out_dir, stem, width, file_name)
+            thumbnails.append((file_name, width, height))
+    return thumbnails
+
+
+def build_thumbnails(image_dir=IMAGE_DIR, out_dir=THUMBNAIL_DIR):
+    """Encode the thumbnails of every PNG in ``image_dir``.
+
+    Returns the number of images.
+    """
+    paths = sorted(glob.glob(os.path.join(image_dir, "*.png")))
+    for path in paths:
+        make_thumbnails(path, out_dir)
+    return len(paths)
+
+
+if __name__ == "__main__":
+    n = build_thumbnails()
+    print(f"Built thumbnails of {n} images in {THUMBNAIL_DIR}")
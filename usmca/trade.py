@@ -0,0 +1,205 @@
+"""Streaming ingestion of the ITA state trade exports.
+
+The ITA exports are wide by year, often UTF-16 and tab-delimited, with values
+written as currency strings such as "$4,201 Million" or as plain numbers scaled by a ``Unit`` column such as
+"Millions of USD". Each file is decoded
+and parsed in fixed-size chunks; every chunk is melted to one row per state,
+year, flow, partner and product, converted to numbers and appended to
+``data/trade.arrow`` as one record batch. Memory use is bounded by the chunk
+size, not the file size, so full industry-by-partner extracts can be
+ingested the same way as the Mexico totals.
+"""
+
+import codecs
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from usmca.sources import DATA_DIR
+from usmca.states import STATE_IDS, STATE_NAMES, normalize_names
+
+TRADE_PATH = os.path.join(DATA_DIR, "trade.arrow")
+
+# Files ingested into the trade store, later files win on duplicate rows
+TRADE_FILES = [
+    os.path.join("USMCA_Total_Trade", "Total_Imports_by_State.csv"),
+    os.path.join("USMCA_Total_Trade", "Total_Exports_by_State.csv"),
+    os.path.join("USMCA_Total_Trade", "Exports", "2024_Exports.csv"),
+    "USMCA_Industry_Mexico_Trade.csv",
+]
+
+ALL_MERCHANDISE = "0--All Merchandise"
+CHUNKSIZE = 50_000
+
+SCHEMA = pa.schema([
+    ("state_name", pa.dictionary(pa.int8(), pa.string())),
+    ("year", pa.int16()),
+    ("flow", pa.string()),
+    ("partner", pa.string()),
+    ("product", pa.string()),
+    ("value", pa.float64()),
+])
+
+# Multipliers that bring every value to millions of USD
+UNITS = {"thousand": 1e-3, "million": 1.0, "billion": 1e3}
+
+# "Millions of USD", "Thousands of US Dollars", "USD", ...
+UNIT_PATTERN = re.compile(r"^(?:(thousand|million|billion)s?\s+of\s+)?(?:us\s*)?(?:usd|\$|dollars)$")
+
+
+def detect_encoding(path):
+    """Pick the file's encoding from its byte order mark."""
+    with open(path, "rb") as f:
+        head = f.read(4)
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    return "utf-8"
+
+
+def unit_scale(units, path):
+    """Multipliers from ``Unit`` column entries to millions of USD.
+
+    Raises ``ValueError`` naming ``path`` for units it does not recognise,
+    rather than guessing the scale of the values.
+    """
+    units = pd.Series(units, dtype=str)
+    normalized = units.str.strip().str.lower()
+    known = normalized.str.fullmatch(UNIT_PATTERN)
+    if not known.all():
+        raise ValueError(f"{path}: unrecognised units {sorted(units[~known].unique())}")
+    # No magnitude word means plain dollars
+    return normalized.str.extract(UNIT_PATTERN)[0].map(UNITS).fillna(1e-6).to_numpy(dtype=float)
+
+
+def parse_currency(values, scale=1.0):
+    """Convert strings like "$4,201 Million" to floats in millions of USD.
+
+    A minus sign may come before or after the dollar sign. Plain numbers are
+    multiplied by ``scale`` (a scalar or one multiplier per value), so by
+    default they are taken to already be in millions. Anything that is not a
+    number becomes NaN.
+    """
+    parts = pd.Series(values, dtype=str).str.extract(
+        r"^\s*(-?)\s*\$?\s*(-?)\s*([\d,.]+)\s*([A-Za-z]*)\s*$")
+    numbers = pd.to_numeric(parts[2].str.replace(",", "", regex=False), errors="coerce")
+    sign = np.where((parts[0] == "-") | (parts[1] == "-"), -1.0, 1.0)
+    sign[(parts[0] == "-") & (parts[1] == "-")] = np.nan
+    suffix = parts[3].fillna("").str.lower()
+    scale = np.where(suffix == "", scale, suffix.map(UNITS))
+    return (numbers * sign * scale).to_numpy(dtype=float)
+
+
+def _long_columns(chunk, path, partner, product):
+    # Map the different ITA layouts onto state / flow / partner / product
+    columns = {c: c.strip() for c in chunk.columns}
+    chunk = chunk.rename(columns=columns)
+    year_cols = [c for c in chunk.columns if c.isdigit() and len(c) == 4]
+
+    flow_col = next((c for c in ("Flow", "Imports", "Exports") if c in chunk.columns), None)
+    missing = [] if "State" in chunk.columns else ["State"]
+    if flow_col is None:
+        missing.append("Flow, Imports or Exports")
+    if missing:
+        raise ValueError(f"{path}: missing columns {missing}")
+
+    ids = pd.DataFrame({"state_name": chunk["State"], "flow": chunk[flow_col]})
+    partner_col = next((c for c in ("Partner", "Country") if c in chunk.columns), None)
+    ids["partner"] = chunk[partner_col].str.strip() if partner_col else partner
+    ids["product"] = chunk["Product"].str.strip() if "Product" in chunk.columns else product
+    units = chunk["Unit"] if "Unit" in chunk.columns else None
+    return ids, chunk[year_cols], units
+
+
+def iter_chunks(path, chunksize=CHUNKSIZE, partner="Mexico", product=ALL_MERCHANDISE):
+    """Yield the rows of one ITA export as long Arrow record batches.
+
+    ``partner`` and ``product`` fill in files that have no partner or
+    product column.
+    """
+    encoding = detect_encoding(path)
+    with open(path, encoding=encoding, newline="") as f:
+        header = f.readline()
+        sep = "\t" if header.count("\t") > header.count(",") else ","
+        f.seek(0)
+
+        for chunk in pd.read_csv(f, sep=sep, dtype=str, chunksize=chunksize):
+            ids, wide, units = _long_columns(chunk, path, partner, product)
+            states = normalize_names(ids["state_name"]).to_numpy()
+            keep = pd.notna(states)
+            ids, wide, states = ids[keep], wide[keep], states[keep]
+
+            # Melt by tiling the id columns across the year columns
+            n_years = wide.shape[1]
+            scale = 1.0 if units is None else np.repeat(unit_scale(units[keep], path), n_years)
+            values = parse_currency(wide.to_numpy().ravel(), scale)
+            years = np.tile(np.array(wide.columns, dtype=np.int16), len(ids))
+            codes = np.repeat([STATE_IDS[s] - 1 for s in states], n_years).astype(np.int8)
+
+            yield pa.record_batch([
+                pa.DictionaryArray.from_arrays(codes, pa.array(STATE_NAMES)),
+                pa.array(years),
+                pa.array(np.repeat(ids["flow"].to_numpy(dtype=str), n_years)),
+                pa.array(np.repeat(ids["partner"].to_numpy(dtype=str), n_years)),
+                pa.array(np.repeat(ids["product"].to_numpy(dtype=str), n_years)),
+                pa.array(values, from_pandas=True),
+            ], schema=SCHEMA)
+
+
+def ingest(paths=None, path=TRADE_PATH, chunksize=CHUNKSIZE):
+    """Stream ``paths`` (default ``TRADE_FILES``) into the trade store.
+
+    Returns the number of rows written.
+    """
+    if paths is None:
+        paths = [os.path.join(DATA_DIR, p) for p in TRADE_FILES]
+
+    rows = 0
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, SCHEMA) as writer:
+            for source in paths:
+                for batch in iter_chunks(source, chunksize):
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+    os.replace(tmp_path, path)
+    return rows
+
+
+def is_stale(paths=None, path=TRADE_PATH):
+    """True if the trade store is missing or older than any source file."""
+    if paths is None:
+        paths = [os.path.join(DATA_DIR, p) for p in TRADE_FILES]
+    if not os.path.exists(path):
+        return True
+    return max(os.path.getmtime(p) for p in paths) > os.path.getmtime(path)
+
+
+def read_trade(data_dir=DATA_DIR, partner="Mexico", product=ALL_MERCHANDISE):
+    """Imports and exports per state and year for one partner and product.
+
+    Ingests the ITA files first if the trade store is out of date, then reads
+    the matching rows from the memory-mapped store.
+    """
+    paths = [os.path.join(data_dir, p) for p in TRADE_FILES]
+    path = os.path.join(data_dir, "trade.arrow")
+    if is_stale(paths, path):
+        ingest(paths, path)
+
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+        table = table.filter(pc.and_(pc.equal(table["partner"], partner),
+                                     pc.equal(table["product"], product)))
+        df = table.to_pandas()
+
+    df["state_name"] = df["state_name"].astype(str)
+    df = df.drop_duplicates(["state_name", "year", "flow"], keep="last")
+    df = df.pivot(index=["state_name", "year"], columns="flow", values="value")
+    df = df.rename(columns=str.lower).rename_axis(columns=None).reset_index()
+    df["year"] = df["year"].astype(int)
+    return df[["state_name", "year", "imports", "exports"]]
@@ -0,0 +1,69 @@
+"""Welch two-sample t-tests of pre vs post intervention years, for every
+state and metric at once.
+
+This is the batched form of the notebook's ``stats.ttest_ind(pre, post,
+equal_var=False)`` loop, used where the ITS regression has too few points to
+say much (percent born in Mexico).
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from usmca.its import to_arrays
+
+
+def ttest_arrays(years, values, intervention_year, min_obs=2):
+    """Welch t-test of post vs pre years for every (state, metric) series.
+
+    ``values`` has shape (state, year, metric) with NaN marking missing
+    observations. Returns a dict of (state, metric) arrays: the pre and post
+    means, their difference, the t statistic (pre minus post, as in
+    ``ttest_ind(pre, post)``) and the two-sided p-value.
+    """
+    post = years >= intervention_year
+    groups = {}
+    for name, in_group in (("pre", ~post), ("post", post)):
+        group = values[:, in_group]
+        n = (~np.isnan(group)).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nanmean(group, axis=1) if group.shape[1] else np.full(n.shape, np.nan)
+            var = np.nanvar(group, axis=1, ddof=1) if group.shape[1] else np.full(n.shape, np.nan)
+        groups[name] = (n, mean, var)
+
+    (n1, m1, v1), (n2, m2, v2) = groups["pre"], groups["post"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s1, s2 = v1 / n1, v2 / n2
+        t_stat = (m1 - m2) / np.sqrt(s1 + s2)
+        dof = (s1 + s2) ** 2 / (s1 ** 2 / (n1 - 1) + s2 ** 2 / (n2 - 1))
+    p_value = 2 * stats.t.sf(np.abs(t_stat), dof)
+
+    too_few = (n1 < min_obs) | (n2 < min_obs)
+    for arr in (t_stat, p_value):
+        arr[too_few] = np.nan
+
+    return {"n_pre": n1, "n_post": n2, "mean_pre": m1, "mean_post": m2,
+            "diff": m2 - m1, "t_stat": t_stat, "p_value": p_value}
+
+
+def fit_ttest(panel, intervention_year, metrics, state_col="state_name",
+              year_col="year", min_obs=2):
+    """Run the Welch t-test for every state x metric in a long panel.
+
+    Returns one row per state and metric. Series with fewer than ``min_obs``
+    observations on either side of the intervention are dropped.
+    """
+    metrics = list(metrics)
+    states, years, values = to_arrays(panel, metrics, state_col, year_col)
+    test = ttest_arrays(years, values, intervention_year, min_obs)
+
+    results = pd.DataFrame({
+        "state": np.repeat(states, len(metrics)),
+        "metric": np.tile(metrics, len(states)),
+        "intervention_year": intervention_year,
+    })
+    for key, arr in test.items():
+        results[key] = arr.ravel()
+
+    keep = (results["n_pre"] >= min_obs) & (results["n_post"] >= min_obs)
+    return results[keep].reset_index(drop=True)